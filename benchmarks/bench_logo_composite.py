@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compare the per-slide logo tint-and-composite step before and after caching the logo mask.
+
+"legacy" reproduces the old per-slide path (open, convert, resize, split, new solid RGBA
+image, putalpha, masked paste); "cached" pastes a flat color through the alpha mask that
+image_generation keeps for the whole process. Reports wall time and Pillow image allocations
+(from Pillow's own allocator stats) per slide, and checks both paths produce identical pixels.
+
+    python benchmarks/bench_logo_composite.py --slides 200
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import image_generation
+
+COLORWAYS = [(242, 210, 65), (220, 53, 69), (255, 255, 255), (90, 160, 255)]
+IMG_SIZE = (1080, 1080)
+LOGO_WIDTH = 200
+LOGO_BOX = (int((IMG_SIZE[0] - LOGO_WIDTH) / 2), 40)
+
+
+def legacy_composite(image, color):
+    logo = Image.open(image_generation._logo_path()).convert("RGBA")
+    aspect_ratio = logo.width / logo.height
+    logo = logo.resize((LOGO_WIDTH, int(LOGO_WIDTH / aspect_ratio)), Image.Resampling.LANCZOS)
+    alpha = logo.split()[-1]
+    colored_logo = Image.new("RGBA", logo.size, color + (255,))
+    colored_logo.putalpha(alpha)
+    image.paste(colored_logo, LOGO_BOX, colored_logo)
+
+
+def cached_composite(image, color):
+    mask = image_generation._logo_mask(LOGO_WIDTH)
+    x, y = LOGO_BOX
+    image.paste(color, (x, y, x + mask.width, y + mask.height), mask)
+
+
+def measure(composite, slides):
+    backgrounds = [Image.new("RGB", IMG_SIZE, (30, 30, 30)) for _ in range(slides)]
+    Image.core.reset_stats()
+    started = time.perf_counter()
+    for idx, image in enumerate(backgrounds):
+        composite(image, COLORWAYS[idx % len(COLORWAYS)])
+    elapsed = time.perf_counter() - started
+    stats = Image.core.get_stats()
+    return elapsed, stats["new_count"], backgrounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark logo recolor and compositing per slide.")
+    parser.add_argument("--slides", type=int, default=100, help="Slides to composite per variant")
+    args = parser.parse_args()
+
+    # Warm the mask cache so the cached variant measures steady-state batch rendering
+    image_generation._logo_mask(LOGO_WIDTH)
+    results = {}
+    for name, composite in (("legacy", legacy_composite), ("cached", cached_composite)):
+        elapsed, allocations, images = measure(composite, args.slides)
+        results[name] = (elapsed, allocations, images)
+
+    legacy_images, cached_images = results["legacy"][2], results["cached"][2]
+    identical = all(a.tobytes() == b.tobytes() for a, b in zip(legacy_images, cached_images))
+
+    print(f"{'variant':<8} {'ms/slide':>9} {'image allocs/slide':>19}")
+    for name, (elapsed, allocations, _) in results.items():
+        print(f"{name:<8} {1000 * elapsed / args.slides:>9.3f} {allocations / args.slides:>19.1f}")
+    print(f"\npixel-identical output: {identical}")
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
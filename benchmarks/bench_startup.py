@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark with a regression budget.
+
+Runs each entry point under ``python -X importtime`` in a fresh interpreter, reports the
+total import time, and fails (exit code 1) if a budget is exceeded or if a module pulls in
+a dependency it should only load on first use (e.g. the CLI importing the LLM stack).
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+from statistics import median
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LLM_STACK = ("langchain_openai", "langchain_core", "langgraph", "openai", "tiktoken")
+PDF_STACK = ("pdfplumber", "pdfminer")
+
+# name -> (python args, import budget in ms, modules that must not be imported)
+# Budgets leave generous headroom over a typical laptop so only real regressions trip them.
+SCENARIOS = {
+    "cli --help": (["-m", "src.main", "--help"], 120, LLM_STACK + PDF_STACK + ("gradio", "PIL")),
+    "cli render": (["-m", "src.main", "render", "--quote", "Benchmark quote.", "--output", "{tmp}"],
+                   250, LLM_STACK + PDF_STACK + ("gradio",)),
+    "worker": (["-c", "import src.worker"], 120, LLM_STACK + PDF_STACK + ("gradio", "PIL")),
+    "pipeline": (["-c", "import src.pipeline"], 120, LLM_STACK + PDF_STACK + ("gradio", "PIL")),
+    # The UI needs Gradio up front, but generation itself happens in the workers
+    "gui": (["-c", "import src.gui"], 6000, LLM_STACK + PDF_STACK),
+}
+
+
+def _parse_importtime(stderr):
+    """Return (total cumulative microseconds, set of imported module names)."""
+    total = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        # Top-level imports have no indentation; their cumulative times add up to the total
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total, modules
+
+
+def run_scenario(args, tmp_dir):
+    cmd = [sys.executable, "-X", "importtime"] + [a.format(tmp=tmp_dir) for a in args]
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd)} failed:\n{proc.stderr[-2000:]}")
+    return _parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time against a budget.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per scenario (median is reported)")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply every budget (e.g. 2 on slow CI machines)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'scenario':<12} {'imports (ms)':>13} {'budget (ms)':>12}  result")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, (cmd_args, budget_ms, forbidden) in SCENARIOS.items():
+            totals = []
+            modules = set()
+            for _ in range(args.runs):
+                total, modules = run_scenario(cmd_args, tmp_dir)
+                totals.append(total / 1000)
+            elapsed = median(totals)
+            budget = budget_ms * args.budget_scale
+            leaked = sorted(m for m in forbidden if m in modules)
+            problems = []
+            if elapsed > budget:
+                problems.append("over budget")
+            if leaked:
+                problems.append("imports " + ", ".join(leaked))
+            print(f"{name:<12} {elapsed:>13.1f} {budget:>12.0f}  {'; '.join(problems) or 'ok'}")
+            if problems:
+                failures.append(name)
+
+    if failures:
+        print(f"\nStartup regression in: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test against a local fake LLM server; spends no real tokens.
+
+Starts src.fake_llm with configurable latency (and optional injected 429s), writes a pool
+of sample article PDFs, then drives N concurrent users through the Gradio handler
+(gui.run_generation, with its worker pool) and/or the CLI (one `python -m src.main` per
+job). Reports throughput, p50/p95 latency, memory high-water marks and a per-stage
+breakdown (PDF extraction, LLM graph, rendering, and everything else: queueing, polling,
+process start-up).
+
+    python benchmarks/load_test.py --users 8 --jobs-per-user 2 --workers 4 --latency 0.5
+    python benchmarks/load_test.py --target cli --users 4 --rate-limit-rate 0.1 --json load.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import resource
+import argparse
+import tempfile
+import threading
+import subprocess
+from statistics import mean
+from types import SimpleNamespace
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from src.fake_llm import FakeLLMServer
+from src.sample_articles import make_pdf_pool
+
+STAGES = ("extract", "graph", "render", "other")
+TIMINGS_RE = re.compile(r"^TIMINGS: (.*)$", re.MULTILINE)
+
+def percentile(values, pct):
+    """Nearest-rank percentile (``pct`` in 0-100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _max_rss_mb(usage):
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _stage_breakdown(latency, timings):
+    stages = {stage: timings.get(stage, 0.0) for stage in STAGES[:-1]}
+    stages["other"] = max(0.0, latency - sum(stages.values()))
+    return stages
+
+
+def _run_users(users, jobs_per_user, job):
+    """Run ``job(user, index)`` ``jobs_per_user`` times in each of ``users`` threads; returns samples and wall time."""
+    samples = []
+    lock = threading.Lock()
+
+    def user_loop(user):
+        for index in range(jobs_per_user):
+            sample = job(user, index)
+            with lock:
+                samples.append(sample)
+
+    threads = [threading.Thread(target=user_loop, args=(user,)) for user in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def run_gui_load(pdfs, users, jobs_per_user, workers, mode, style, work_dir):
+    """Drive gui.run_generation from ``users`` threads with a pool of ``workers`` worker processes."""
+    os.environ["JOB_DB_PATH"] = os.path.join(work_dir, "jobs.db")
+    os.environ["ARTIFACT_ROOT"] = os.path.join(work_dir, "artifacts")
+    from src import gui
+    from src.job_queue import DONE
+    from src.worker import WorkerPool
+
+    # Stand-ins for gr.Request: each simulated user gets its own session, as real browsers do,
+    # so uploads, outputs and artifact eviction are per user rather than all in "anonymous"
+    requests = [SimpleNamespace(session_hash=f"load-user-{user}") for user in range(users)]
+
+    def job(user, index):
+        pdf = pdfs[(user + index * users) % len(pdfs)]
+        started = time.perf_counter()
+        try:
+            outputs = list(gui.run_generation(pdf, f"User {user}", style, mode, request=requests[user]))
+            status = outputs[-1][3].get("value", "")
+            error = None if status == "Done." else status
+        except Exception as exc:  # noqa: BLE001 - counted as a failed request
+            error = str(exc)
+        return {"latency": time.perf_counter() - started, "error": error}
+
+    pool = WorkerPool(concurrency=workers, db_path=os.environ["JOB_DB_PATH"], poll_interval=0.1).start()
+    try:
+        samples, wall = _run_users(users, jobs_per_user, job)
+    finally:
+        pool.stop()
+
+    # The handler only returns outputs, so stage timings come from the finished jobs themselves
+    jobs = gui._get_job_queue().jobs(DONE)
+    stages = [_stage_breakdown(j["updated_at"] - j["created_at"], j["result"].get("timings") or {}) for j in jobs]
+    memory = {
+        "ui process": _max_rss_mb(resource.getrusage(resource.RUSAGE_SELF)),
+        "largest worker": _max_rss_mb(resource.getrusage(resource.RUSAGE_CHILDREN)),
+    }
+    return samples, wall, stages, memory
+
+
+def run_cli_load(pdfs, users, jobs_per_user, mode, style, work_dir):
+    """Run one CLI process per job, ``users`` at a time."""
+    peak = {"cli process": 0.0}
+    lock = threading.Lock()
+
+    def job(user, index):
+        pdf = pdfs[(user + index * users) % len(pdfs)]
+        output_dir = os.path.join(work_dir, f"cli-user-{user}-{index}")
+        os.makedirs(output_dir, exist_ok=True)
+        cmd = [sys.executable, "-m", "src.main", "--article", pdf, "--output", output_dir,
+               "--mode", mode, "--style", style]
+        started = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=PROJECT_ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        output = proc.stdout.read()
+        proc.stdout.close()
+        # wait4 reports this child's own peak memory
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        latency = time.perf_counter() - started
+        with lock:
+            peak["cli process"] = max(peak["cli process"], _max_rss_mb(usage))
+
+        match = TIMINGS_RE.search(output)
+        timings = {}
+        if match:
+            for part in match.group(1).split(", "):
+                stage, seconds = part.split()
+                timings[stage] = float(seconds.rstrip("s"))
+        error = None if proc.returncode == 0 else (output.strip().splitlines() or ["exit code"])[-1]
+        return {"latency": latency, "error": error, "stages": _stage_breakdown(latency, timings)}
+
+    samples, wall = _run_users(users, jobs_per_user, job)
+    stages = [s["stages"] for s in samples if s["error"] is None]
+    return samples, wall, stages, peak
+
+
+def summarize(target, samples, wall, stages, memory):
+    ok = [s["latency"] for s in samples if s["error"] is None]
+    return {
+        "target": target,
+        "jobs": len(samples),
+        "failed": len(samples) - len(ok),
+        "errors": sorted({s["error"] for s in samples if s["error"]})[:5],
+        "wall_seconds": wall,
+        "throughput_per_minute": 60 * len(ok) / wall if wall else 0.0,
+        "latency_p50": percentile(ok, 50) if ok else None,
+        "latency_p95": percentile(ok, 95) if ok else None,
+        "latency_max": max(ok) if ok else None,
+        "memory_mb": memory,
+        "stages": {stage: {"mean": mean(s[stage] for s in stages), "p95": percentile([s[stage] for s in stages], 95)}
+                   for stage in STAGES} if stages else {},
+    }
+
+
+def print_report(summary):
+    def seconds(value):
+        return "-" if value is None else f"{value:.2f}s"
+
+    print(f"\n== {summary['target']}: {summary['jobs']} jobs, {summary['failed']} failed, "
+          f"{summary['wall_seconds']:.1f}s wall ==")
+    print(f"throughput   {summary['throughput_per_minute']:.1f} articles/min")
+    print(f"latency      p50 {seconds(summary['latency_p50'])}  p95 {seconds(summary['latency_p95'])}  "
+          f"max {seconds(summary['latency_max'])}")
+    print("peak memory  " + "  ".join(f"{name} {mb:.0f} MB" for name, mb in summary["memory_mb"].items()))
+    if summary["stages"]:
+        print(f"{'stage':<10} {'mean':>8} {'p95':>8}")
+        for stage, values in summary["stages"].items():
+            print(f"{stage:<10} {values['mean']:>7.2f}s {values['p95']:>7.2f}s")
+    for error in summary["errors"]:
+        print(f"error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the UI handler and CLI against a fake LLM server.")
+    parser.add_argument("--target", choices=["gui", "cli", "both"], default="both")
+    parser.add_argument("--users", "-u", type=int, default=4, help="Concurrent users")
+    parser.add_argument("--jobs-per-user", "-n", type=int, default=2, help="Articles each user submits in turn")
+    parser.add_argument("--workers", "-w", type=int, default=2, help="Worker processes behind the UI")
+    parser.add_argument("--pdfs", type=int, default=5, help="Sample PDFs in the pool")
+    parser.add_argument("--mode", choices=["standard", "single_call"], default="standard")
+    parser.add_argument("--style", choices=["Original", "The Free Press"], default="Original")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Extra random fake LLM latency, up to this")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of LLM calls answered with 429")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(latency=args.latency, jitter=args.jitter, rate_limit_rate=args.rate_limit_rate,
+                           retry_after=0.2, seed=0).start()
+    # Inherited by worker and CLI subprocesses
+    os.environ.update({"OPENAI_BASE_URL": server.base_url, "OPENAI_API_KEY": "fake-key",
+                       "LLM_MAX_RETRIES": os.getenv("LLM_MAX_RETRIES", "8"),
+                       "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")})
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="load-test-") as work_dir:
+            pdfs = make_pdf_pool(work_dir, args.pdfs)
+            print(f"Fake LLM at {server.base_url}; {args.users} users x {args.jobs_per_user} articles, "
+                  f"{args.pdfs} sample PDFs, mode {args.mode}")
+            # The UI runs first: RUSAGE_CHILDREN would otherwise include the CLI processes
+            if args.target in ("gui", "both"):
+                results.append(summarize("gui", *run_gui_load(pdfs, args.users, args.jobs_per_user, args.workers,
+                                                              args.mode, args.style, work_dir)))
+            if args.target in ("cli", "both"):
+                results.append(summarize("cli", *run_cli_load(pdfs, args.users, args.jobs_per_user, args.mode,
+                                                              args.style, work_dir)))
+    finally:
+        server.stop()
+
+    for summary in results:
+        print_report(summary)
+    print(f"\nfake LLM: {server.requests} requests, {server.rate_limited} rate limited, "
+          f"{server.max_in_flight} max in flight")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results,
+                       "llm": {"requests": server.requests, "rate_limited": server.rate_limited}}, f, indent=2)
+    if any(summary["failed"] for summary in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Shared test setup: an isolated LLM scheduler for every test and the local fake OpenAI server.
+"""
+
+import pytest
+
+from src import llm_scheduler, nodes
+from src.fake_llm import FakeLLMServer
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_limits(monkeypatch, tmp_path):
+    """
+    Keep tests off the shared LLM limits database, which defaults to the same file a locally
+    running UI or worker uses: nodes get a process-local scheduler, and any worker process a
+    test starts keeps its limits under ``tmp_path``.
+    """
+    monkeypatch.setenv("LLM_LIMITS_DB", str(tmp_path / "llm_limits.sqlite3"))
+    scheduler = llm_scheduler.LLMScheduler(base_delay=0.01)
+    monkeypatch.setattr(llm_scheduler, "scheduler", scheduler)
+    monkeypatch.setattr(nodes, "scheduler", scheduler)
+    return scheduler
+
+
+@pytest.fixture
+def fake_openai(monkeypatch, isolated_llm_limits):
+    """
+    Start a FakeLLMServer with the given options (latency, injected 429s, ...) and point the
+    OpenAI client at it. Returns the server, whose counters tests can inspect.
+    """
+    servers = []
+
+    def start(**options):
+        server = FakeLLMServer(**options).start()
+        servers.append(server)
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        monkeypatch.setenv("OPENAI_API_KEY", "fake")
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
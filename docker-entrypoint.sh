@@ -0,0 +1,15 @@
+#!/bin/sh
+set -e
+
+# Volumes are mounted owned by root; hand the data directories to appuser, then drop privileges
+if [ "$(id -u)" = "0" ]; then
+  for path in "${JOB_DB_PATH:+$(dirname "$JOB_DB_PATH")}" "$ARTIFACT_ROOT"; do
+    if [ -n "$path" ]; then
+      mkdir -p "$path"
+      chown appuser:appuser "$path"
+    fi
+  done
+  exec setpriv --reuid=appuser --regid=appuser --init-groups "$@"
+fi
+
+exec "$@"
@@ -0,0 +1,179 @@
+import os
+import re
+import time
+import shutil
+import tempfile
+import zipfile
+
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 6 * 60 * 60
+# Runs touched this recently are never evicted: the UI creates a run before its job is queued
+IN_USE_GRACE_SECONDS = 60
+
+# Already-compressed formats gain nothing from deflate, so they are stored as-is
+_STORED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".pdf", ".zip"}
+
+
+def _default_root():
+    return os.getenv("ARTIFACT_ROOT") or os.path.join(tempfile.gettempdir(), "ai_post_artifacts")
+
+
+def _safe_name(session_id):
+    return re.sub(r"[^A-Za-z0-9_-]", "_", session_id or "anonymous")[:64] or "anonymous"
+
+
+def _dir_usage(path):
+    """Return (total bytes, newest mtime) for everything under ``path``."""
+    total = 0
+    newest = os.path.getmtime(path)
+    for dirpath, _, filenames in os.walk(path):
+        newest = max(newest, os.path.getmtime(dirpath))
+        for name in filenames:
+            try:
+                stat = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            total += stat.st_size
+            newest = max(newest, stat.st_mtime)
+    return total, newest
+
+
+class ArtifactStore:
+    """
+    Per-session working directories for uploads, rendered images and archives.
+
+    Each browser session gets its own directory under ``root`` so concurrent users
+    never share files, and each generation run its own ``job_*`` directory inside it.
+    ``evict`` works on those run directories: it removes the ones idle for longer than
+    ``max_age_seconds`` and then the least recently used ones, from any session, until the
+    store fits in ``max_bytes``. Directories still used by a job are never removed.
+    """
+
+    def __init__(self, root=None, max_bytes=None, max_age_seconds=None):
+        self.root = os.path.abspath(root or _default_root())
+        self.max_bytes = max_bytes if max_bytes is not None else int(
+            os.getenv("ARTIFACT_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else float(
+            os.getenv("ARTIFACT_MAX_AGE_SECONDS", DEFAULT_MAX_AGE_SECONDS))
+        os.makedirs(self.root, exist_ok=True)
+
+    def session_dir(self, session_id):
+        path = os.path.join(self.root, _safe_name(session_id))
+        os.makedirs(path, exist_ok=True)
+        # Touch so an active session counts as recently used
+        os.utime(path)
+        return path
+
+    def new_job_dir(self, session_id):
+        """A fresh directory inside the session for one generation run."""
+        return tempfile.mkdtemp(prefix="job_", dir=self.session_dir(session_id))
+
+    def owns(self, path):
+        """True if ``path`` lives inside this store."""
+        return os.path.commonpath([self.root, os.path.abspath(path)]) == self.root
+
+    def _entry(self, path):
+        # The session-level entry (run directory or loose file such as a zip) containing ``path``
+        if not self.owns(path):
+            return None
+        parts = os.path.relpath(os.path.abspath(path), self.root).split(os.sep)
+        return os.path.join(*parts[:2]) if len(parts) >= 2 and parts[0] != "." else None
+
+    def _entries(self, sessions=None):
+        """Yield (last used, bytes, relative name, path) for each entry of each session directory."""
+        for session in sessions if sessions is not None else os.listdir(self.root):
+            session_path = os.path.join(self.root, session)
+            if not os.path.isdir(session_path):
+                continue
+            for name in os.listdir(session_path):
+                path = os.path.join(session_path, name)
+                try:
+                    if os.path.isdir(path):
+                        size, last_used = _dir_usage(path)
+                    else:
+                        stat = os.stat(path)
+                        size, last_used = stat.st_size, stat.st_mtime
+                except OSError:
+                    continue
+                yield last_used, size, os.path.join(session, name), path
+
+    def _protected(self, keep):
+        return {entry for entry in (self._entry(path) for path in keep) if entry}
+
+    @staticmethod
+    def _remove(path):
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def remove_session(self, session_id, keep=()):
+        """Remove a session's files, except run directories containing a path in ``keep``."""
+        name = _safe_name(session_id)
+        protected = self._protected(keep)
+        for _, _, entry, path in list(self._entries([name])):
+            if entry not in protected:
+                self._remove(path)
+        try:
+            os.rmdir(os.path.join(self.root, name))
+        except OSError:
+            # Still holds a protected run, or already gone
+            pass
+
+    def evict(self, keep=(), now=None):
+        """
+        Apply age- and size-based eviction to run directories. ``keep`` lists paths still in
+        use (an active job's upload or output directory); the runs containing them are never
+        removed. Returns the removed entries as ``session/run`` names.
+        """
+        now = now if now is not None else time.time()
+        protected = self._protected(keep)
+        removed = []
+        remaining = []
+        for last_used, size, name, path in self._entries():
+            if name in protected:
+                remaining.append((last_used, size, name, path))
+            elif now - last_used > self.max_age_seconds:
+                self._remove(path)
+                removed.append(name)
+            elif now - last_used > IN_USE_GRACE_SECONDS:
+                remaining.append((last_used, size, name, path))
+            else:
+                # Just created: its job may not be queued yet, so treat it as in use
+                protected.add(name)
+                remaining.append((last_used, size, name, path))
+
+        total = sum(size for _, size, _, _ in remaining)
+        for last_used, size, name, path in sorted(remaining):
+            if total <= self.max_bytes:
+                break
+            if name in protected:
+                continue
+            self._remove(path)
+            removed.append(name)
+            total -= size
+
+        for session in os.listdir(self.root):
+            path = os.path.join(self.root, session)
+            try:
+                if os.path.isdir(path) and not os.listdir(path) and now - os.path.getmtime(path) > self.max_age_seconds:
+                    os.rmdir(path)
+            except OSError:
+                continue
+        return removed
+
+
+def build_zip(paths, dest):
+    """
+    Write ``paths`` into a zip at ``dest`` (a filesystem path or a writable binary file object,
+    e.g. ``io.BytesIO``). Images are stored rather than re-deflated.
+    """
+    with zipfile.ZipFile(dest, "w") as zf:
+        for p in paths:
+            ext = os.path.splitext(p)[1].lower()
+            compression = zipfile.ZIP_STORED if ext in _STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            zf.write(p, arcname=os.path.basename(p), compress_type=compression)
+    return dest
@@ -0,0 +1,104 @@
+import os
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from .constants import DEFAULT_BYLINE
+
+# Text of the last slide, pointing readers from the carousel to the article
+CLOSING_TEXT = "Read the full article at the link in bio."
+
+
+def plan_carousel(article_title, quotes, byline=DEFAULT_BYLINE, style="Original"):
+    """
+    Lay out a carousel: a cover with the article title, one slide per quote and a closing slide.
+
+    Layout is decided once for the whole set: every quote slide shares the largest font size
+    at which all quotes fit, and the cover and closing slides share one headline size drawn
+    through the same template without quote marks. Returns one dict per slide, in order.
+    """
+    from .pipeline import format_byline, get_style_module
+
+    renderer = get_style_module(style)
+    byline = format_byline(byline)
+    quote_size = renderer.fit_font_size(quotes)
+    headline_size = renderer.fit_font_size([article_title, CLOSING_TEXT], wrap_quote=False)
+
+    slides = [{"kind": "cover", "text": article_title, "byline": byline, "font_size": headline_size,
+               "wrap_quote": False}]
+    slides += [{"kind": "quote", "text": quote, "byline": byline, "font_size": quote_size, "wrap_quote": True}
+               for quote in quotes]
+    slides.append({"kind": "closing", "text": CLOSING_TEXT, "byline": "", "font_size": headline_size,
+                   "wrap_quote": False})
+    for index, slide in enumerate(slides):
+        # Zero-padded index so the files sort in posting order
+        slide["index"] = index
+        slide["title"] = f"{article_title}_carousel_{index:02d}_{slide['kind']}"
+        slide["style"] = style
+    return slides
+
+
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _render_slide(slide, save_dir, force=False):
+    from .render_cache import render_if_changed
+
+    path, rendered = render_if_changed(slide["text"], slide["byline"], slide["title"], save_dir=save_dir,
+                                       style=slide["style"], force=force, font_size=slide["font_size"],
+                                       wrap_quote=slide["wrap_quote"])
+    return os.path.abspath(path), rendered
+
+
+def render_carousel(article_title, quotes, caption="", byline=DEFAULT_BYLINE, style="Original", save_dir=None,
+                    workers=None, force=False):
+    """
+    Render a full carousel for one article and bundle it.
+
+    Slides render in parallel (``workers`` processes, default one per CPU up to the slide
+    count; ``1`` renders in-process) and unchanged slides are skipped unless ``force`` is set.
+    Writes ``{article_title}_carousel.json`` (ordered slides, shared font sizes and caption)
+    and ``{article_title}_carousel.zip`` (slides in posting order plus the caption), and
+    returns the manifest as a dict with ``manifest_path`` and ``bundle_path`` added.
+    """
+    from .artifacts import build_zip
+
+    save_dir = save_dir or os.getcwd()
+    os.makedirs(save_dir, exist_ok=True)
+    slides = plan_carousel(article_title, quotes, byline=byline, style=style)
+
+    workers = workers or min(len(slides), os.cpu_count() or 1)
+    if workers > 1:
+        # Callers such as the job worker have live threads (heartbeat, HTTP clients), which a
+        # forked child could deadlock on; forkserver children start from a clean process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as executor:
+            # map() yields in submission order, so results line up with the slides
+            outcomes = list(executor.map(_render_slide, slides, [save_dir] * len(slides), [force] * len(slides)))
+    else:
+        outcomes = [_render_slide(slide, save_dir, force) for slide in slides]
+
+    for slide, (path, rendered) in zip(slides, outcomes):
+        slide["path"] = path
+        slide["rendered"] = rendered
+
+    caption_path = os.path.abspath(os.path.join(save_dir, f"{article_title}_carousel_caption.txt"))
+    with open(caption_path, "w", encoding="utf-8") as f:
+        f.write(caption or "")
+
+    manifest = {
+        "article_title": article_title,
+        "style": style,
+        "quote_font_size": slides[1]["font_size"] if len(slides) > 2 else None,
+        "headline_font_size": slides[0]["font_size"],
+        "caption": caption or "",
+        "slides": [{k: slide[k] for k in ("index", "kind", "title", "text", "path", "rendered")}
+                   for slide in slides],
+    }
+    manifest_path = os.path.abspath(os.path.join(save_dir, f"{article_title}_carousel.json"))
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    bundle_path = os.path.abspath(os.path.join(save_dir, f"{article_title}_carousel.zip"))
+    build_zip([slide["path"] for slide in slides] + [caption_path, manifest_path], bundle_path)
+    return {**manifest, "manifest_path": manifest_path, "bundle_path": bundle_path}
@@ -0,0 +1,11 @@
+# Plain constants shared by the CLI, UI and pipeline. Keep this module free of heavy
+# imports: the CLI builds its argument parser from it before anything else is loaded.
+
+STYLES = ("Original", "The Free Press")
+
+# "standard" runs three LLM calls (quotes and summary in parallel, then the caption);
+# "single_call" asks for all three outputs in one structured response: one request and roughly
+# half the input tokens, but not faster end to end (see benchmarks/bench_graph_modes.py).
+MODES = ("standard", "single_call")
+
+DEFAULT_BYLINE = "-Oren Hartstein"
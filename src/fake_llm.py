@@ -0,0 +1,219 @@
+"""
+Local OpenAI-compatible chat completions server for tests, benchmarks and offline development.
+
+Answers ``POST /v1/chat/completions`` with canned responses shaped like the real ones: a
+``Quotes``/``PostBundle`` JSON object when a ``json_schema`` response format is requested,
+otherwise a summary or caption depending on the task (system) message. It can inject latency and
+429 rate-limit responses. Point the app at it with ``OPENAI_BASE_URL``:
+
+    python -m src.fake_llm --port 8765 --latency 0.5 --rate-limit-rate 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake python -m src.main --article article.pdf
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_QUOTES = [
+    "The point of a university is not to confirm what students already believe, but to give them "
+    "the tools and the courage to test those beliefs against the strongest arguments on the other side.",
+    "When a campus treats disagreement as harm, it teaches students that the safest opinion is the "
+    "one they never say out loud, and that lesson outlasts anything taught in the classroom.",
+    "Intellectual diversity is not a favor granted to a minority of dissenters; it is the condition "
+    "under which everyone, on every side, learns to think more carefully.",
+]
+CANNED_SUMMARY = (
+    "The article examines how students and faculty with minority viewpoints experience campus life, "
+    "and argues that open disagreement strengthens rather than threatens a university.\n\n"
+    "Drawing on interviews and the author's own experience, it describes self-censorship in seminars "
+    "and proposes concrete ways departments can make room for unpopular arguments."
+)
+CANNED_CAPTION = (
+    "What happens to a university when some ideas can no longer be said out loud?\n\n"
+    "In this week's piece, our writer looks at self-censorship on campus and why intellectual "
+    "diversity benefits everyone, not only those who disagree.\n\n"
+    "Full article at the link in bio."
+)
+
+
+def _approx_tokens(text):
+    return max(1, len(text) // 4) if text else 0
+
+
+def _message_text(message):
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        # Content parts ({"type": "text", "text": ...})
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def canned_content(body):
+    """The assistant message content for a chat completions request body."""
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        fields = set(schema.get("properties", {}))
+        value = {"quotes": CANNED_QUOTES}
+        if "summary" in fields:
+            value["summary"] = CANNED_SUMMARY
+        if "insta_caption" in fields:
+            value["insta_caption"] = CANNED_CAPTION
+        return json.dumps(value)
+    if response_format.get("type") == "json_object":
+        return json.dumps({"quotes": CANNED_QUOTES})
+    # The task is the last system message (the caption call puts its summary and quotes after it)
+    system = [m for m in body.get("messages") or [] if m.get("role") == "system"] or [{}]
+    task = _message_text(system[-1]).lower()
+    return CANNED_CAPTION if "caption" in task else CANNED_SUMMARY
+
+
+class FakeLLMServer:
+    """
+    Threaded fake OpenAI server. ``latency`` (+ up to ``jitter``) seconds are added to each
+    response; the first ``rate_limit_first`` requests, and then a ``rate_limit_rate`` fraction
+    of the rest, get a 429 with ``Retry-After: retry_after`` (omitted when None).
+
+    Counters: ``requests``, ``rate_limited``, ``in_flight`` and ``max_in_flight``.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_limit_first=0, rate_limit_rate=0.0,
+                 retry_after=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_first = rate_limit_first
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _should_rate_limit(self):
+        with self._lock:
+            self.requests += 1
+            limited = self.requests <= self.rate_limit_first or self._rng.random() < self.rate_limit_rate
+            self.rate_limited += limited
+            return limited
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):  # noqa: A002 - silence per-request logging
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+                    return
+                with server._lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.latency + server._rng.uniform(0, server.jitter))
+                    if server._should_rate_limit():
+                        headers = {"retry-after": str(server.retry_after)} if server.retry_after is not None else {}
+                        self._send_json(429, {"error": {"message": "Rate limit reached (fake server)",
+                                                        "type": "requests", "code": "rate_limit_exceeded"}}, headers)
+                        return
+                    self._send_json(200, server.completion(body))
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+    def completion(self, body):
+        content = canned_content(body)
+        prompt_tokens = sum(_approx_tokens(_message_text(m)) for m in body.get("messages") or [])
+        completion_tokens = _approx_tokens(content)
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "finish_reason": "stop",
+                "logprobs": None,
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": 0},
+            },
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake OpenAI chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency of up to this many seconds")
+    parser.add_argument("--rate-limit-first", type=int, default=0, help="Answer the first N requests with 429")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of later requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with 429s")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                           rate_limit_first=args.rate_limit_first, rate_limit_rate=args.rate_limit_rate,
+                           retry_after=args.retry_after)
+    print(f"Fake OpenAI server on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
 import re
+from functools import lru_cache
 
 
 def _wrap_text(draw, text, font, max_width):
@@ -77,26 +78,13 @@ def _draw_bold_text(draw, text, position, font, fill):
     for dx, dy in offsets:
         draw.text((x + dx, y + dy), text, fill=fill, font=font)
 
-def generate_image(quote, byline, title, save_dir=None):
+# Quote font size, and the vertical room for the quote between the logo and the byline
+QUOTE_FONT_SIZE = 60
+MAX_TEXT_HEIGHT = 820
 
-    # 1. Define image dimensions and background color - The Free Press style
-    img_width = 1080  # Standard Instagram post aspect ratio (square)
-    img_height = 1080
-    # The Free Press uses clean white/light backgrounds with dark text
-    bg_color = (245, 241, 235)  # Clean white background
-
-    # 2. Create a new image with the specified dimensions and color
-    image = Image.new('RGB', (img_width, img_height), color=bg_color)
-
-    # 3. Get a drawing context
-    draw = ImageDraw.Draw(image)
-
-    # 4. Define the text to display. This is a long paragraph to match the image.
-    long_text = _ensure_wrapped_in_double(_normalize_quotes(quote))
-    byline_text = "-Oren Hartstein"
-    logo_text = "The Free Press"
-
-    # 5. Load fonts - The Free Press uses very bold, heavy sans-serif fonts
+@lru_cache(maxsize=16)
+def _load_fonts(main_size=QUOTE_FONT_SIZE):
+    # The Free Press uses very bold, heavy sans-serif fonts
     try:
         # Use available system fonts
         font_paths = [
@@ -114,14 +102,14 @@ def generate_image(quote, byline, title, save_dir=None):
                 if font_path.endswith('.ttc'):
                     # For font collections, try to get bold variant (index 1)
                     try:
-                        font_main = ImageFont.truetype(font_path, size=60, index=1)
+                        font_main = ImageFont.truetype(font_path, size=main_size, index=1)
                         font_logo = ImageFont.truetype(font_path, size=60, index=1)
                     except (IOError, OSError, TypeError):
                         # Fallback to regular variant (index 0)
-                        font_main = ImageFont.truetype(font_path, size=60, index=0)
+                        font_main = ImageFont.truetype(font_path, size=main_size, index=0)
                         font_logo = ImageFont.truetype(font_path, size=60, index=0)
                 else:
-                    font_main = ImageFont.truetype(font_path, size=60)
+                    font_main = ImageFont.truetype(font_path, size=main_size)
                     font_logo = ImageFont.truetype(font_path, size=60)
                 break
             except (IOError, OSError, TypeError):
@@ -155,6 +143,60 @@ def generate_image(quote, byline, title, save_dir=None):
         font_main = ImageFont.load_default()
         font_byline = ImageFont.load_default()
         font_logo = ImageFont.load_default()
+    return font_main, font_byline, font_logo
+
+def _slide_text(text, wrap_quote=True):
+    return _ensure_wrapped_in_double(_normalize_quotes(text)) if wrap_quote else text
+
+def _text_block_height(draw, lines, font, line_spacing=8):
+    heights = []
+    for line in lines:
+        bbox = draw.textbbox((0, 0), line, font=font)
+        heights.append(bbox[3] - bbox[1])
+    return sum(heights) + (len(heights) - 1) * line_spacing
+
+def fit_font_size(texts, max_size=QUOTE_FONT_SIZE, min_size=32, wrap_quote=True):
+    """
+    Largest font size (down to ``min_size``) at which every text fits between the logo
+    and the byline, so a set of slides can share one size.
+    """
+    draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    padding = 120
+    for size in range(max_size, min_size, -2):
+        font_main = _load_fonts(size)[0]
+        if all(
+            _text_block_height(draw, _wrap_text(draw, _slide_text(text, wrap_quote), font_main, 1080 - padding * 2),
+                               font_main) <= MAX_TEXT_HEIGHT
+            for text in texts
+        ):
+            return size
+    return min_size
+
+def generate_image(quote, byline, title, save_dir=None, pnginfo=None, font_size=None, wrap_quote=True):
+    """
+    Render one slide. ``font_size`` overrides the quote font size and ``wrap_quote=False``
+    draws the text as-is (used for carousel cover and closing slides).
+    """
+
+    # 1. Define image dimensions and background color - The Free Press style
+    img_width = 1080  # Standard Instagram post aspect ratio (square)
+    img_height = 1080
+    # The Free Press uses clean white/light backgrounds with dark text
+    bg_color = (245, 241, 235)  # Clean white background
+
+    # 2. Create a new image with the specified dimensions and color
+    image = Image.new('RGB', (img_width, img_height), color=bg_color)
+
+    # 3. Get a drawing context
+    draw = ImageDraw.Draw(image)
+
+    # 4. Define the text to display. This is a long paragraph to match the image.
+    long_text = _slide_text(quote, wrap_quote)
+    byline_text = "-Oren Hartstein"
+    logo_text = "The Free Press"
+
+    # 5. Load fonts (cached per size)
+    font_main, font_byline, font_logo = _load_fonts(font_size or QUOTE_FONT_SIZE)
 
     # 6. Wrap the main text based on the image width with some padding
     # The Free Press uses more generous padding
@@ -254,5 +296,7 @@ def generate_image(quote, byline, title, save_dir=None):
             # If directory creation fails, fall back to current directory
             save_dir = None
     output_path = os.path.join(save_dir, title + ".png") if save_dir else (title + ".png")
-    image.save(output_path)
+    # pnginfo carries metadata such as the render key used to skip unchanged slides
+    image.save(output_path, pnginfo=pnginfo)
     print(f"Image {title} generated successfully!")
+    return output_path
@@ -1,23 +1,32 @@
 from langgraph.graph import START, END, StateGraph
-from .nodes import quote_generator, summarizer, insta_caption_generator
+from .nodes import quote_generator, summarizer, insta_caption_generator, post_bundle_generator
 from .schemas import State
+from .constants import MODES
 
 
 class Graph:
-    def __init__(self):
+    def __init__(self, mode="standard"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown graph mode: {mode!r} (expected one of {', '.join(MODES)})")
+        self.mode = mode
         builder = StateGraph(State)
 
-        # Nodes
-        builder.add_node("quote_generator", quote_generator)
-        builder.add_node("summarizer", summarizer)
-        builder.add_node("insta_caption_generator", insta_caption_generator)
+        if mode == "single_call":
+            builder.add_node("post_bundle_generator", post_bundle_generator)
+            builder.add_edge(START, "post_bundle_generator")
+            builder.add_edge("post_bundle_generator", END)
+        else:
+            # Nodes
+            builder.add_node("quote_generator", quote_generator)
+            builder.add_node("summarizer", summarizer)
+            builder.add_node("insta_caption_generator", insta_caption_generator)
 
-        # Edges
-        builder.add_edge(START, "quote_generator")
-        builder.add_edge(START, "summarizer")
-        builder.add_edge("summarizer", "insta_caption_generator")
-        builder.add_edge("quote_generator", "insta_caption_generator")
-        builder.add_edge("insta_caption_generator", END)
+            # Edges
+            builder.add_edge(START, "quote_generator")
+            builder.add_edge(START, "summarizer")
+            builder.add_edge("summarizer", "insta_caption_generator")
+            builder.add_edge("quote_generator", "insta_caption_generator")
+            builder.add_edge("insta_caption_generator", END)
 
         self.graph = builder.compile()
 
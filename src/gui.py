@@ -1,90 +1,135 @@
 import os
-import zipfile
 import sys
 import subprocess
-import pdfplumber
 import shutil
-import tempfile
 import gradio as gr
-from dotenv import load_dotenv
-from .graph import Graph
-from .image_generation import generate_image
-from .fp_post_generation import generate_image as fp_generate_image
+from .artifacts import ArtifactStore, build_zip
+from .job_queue import JobQueue, QUEUED, RUNNING, FAILED, TERMINAL_STATUSES
+from .worker import WorkerPool
 
 
-def run_generation(article_path: str, author: str, style: str = "Original"):
+# Seconds the UI waits on a job before giving up, e.g. when no worker is running
+DEFAULT_JOB_TIMEOUT = 900
+
+_job_queue = None
+_artifact_store = None
+
+
+def _get_job_queue():
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
+
+
+def _get_artifact_store():
+    global _artifact_store
+    if _artifact_store is None:
+        _artifact_store = ArtifactStore()
+    return _artifact_store
+
+
+def _active_job_paths():
+    """Upload and output paths of every queued or running job, which eviction must leave alone."""
+    queue = _get_job_queue()
+    paths = []
+    for job in queue.jobs(QUEUED) + queue.jobs(RUNNING):
+        payload = job["payload"]
+        paths += [p for p in (payload.get("save_dir"), payload.get("article_path")) if p]
+    return paths
+
+
+def _session_id(request):
+    return getattr(request, "session_hash", None) or "anonymous"
+
+
+def _status_only(message):
+    return (
+        gr.update(value=[], visible=False),
+        gr.update(value="", visible=False),
+        gr.update(value=[], visible=False),
+        gr.update(value=message, visible=True),
+        [],
+        gr.update(visible=False),
+    )
+
+
+def _describe_job(job):
+    if job["status"] == QUEUED:
+        if job.get("error"):
+            # Requeued after a transient failure such as a persistent rate limit; it waits out a backoff first
+            return f"Waiting to retry after: {job['error']}"
+        ahead = job.get("position") or 0
+        if ahead:
+            return f"Queued ({ahead} job{'s' if ahead != 1 else ''} ahead)..."
+        return job.get("progress") or "Queued, starting shortly..."
+    return job.get("progress") or "Generating images... this may take a minute."
+
+
+def run_generation(article_path: str, author: str, style: str = "Original", mode: str = "standard",
+                   carousel: bool = False, request: gr.Request = None):
     article_path = (article_path or "").strip()
     author = (author or "").strip()
     if not article_path:
-        yield (
-            gr.update(value=[], visible=False),
-            gr.update(value="", visible=False),
-            gr.update(value=[], visible=False),
-            gr.update(value="Please upload a PDF.", visible=True),
-            [],
-            gr.update(visible=False),
-        )
+        yield _status_only("Please upload a PDF.")
         return
     try:
-        load_dotenv()
-        # Make a safe copy of the uploaded file so streaming (yields) doesn't race with temp cleanup
+        store = _get_artifact_store()
+        session_id = _session_id(request)
+        store.evict(keep=_active_job_paths())
+        # Make a safe copy of the uploaded file in this session's own directory so the worker
+        # doesn't race with Gradio's temp cleanup and concurrent users never share outputs
         safe_article_path = None
         try:
-            temp_dir = tempfile.mkdtemp(prefix="ai_post_")
-            safe_article_path = os.path.join(temp_dir, os.path.basename(article_path))
+            job_dir = store.new_job_dir(session_id)
+            safe_article_path = os.path.join(job_dir, os.path.basename(article_path))
             shutil.copy2(article_path, safe_article_path)
-            # Inform the user immediately that generation has started
-            yield (
-                gr.update(value=[], visible=False),
-                gr.update(value="", visible=False),
-                gr.update(value=[], visible=False),
-                gr.update(value="Generating images... this may take a minute.", visible=True),
-                [],
-                gr.update(visible=False),
-            )
         except Exception:
             safe_article_path = None
 
         open_path = safe_article_path or article_path
-        text = ""
-        with pdfplumber.open(open_path) as pdf:
-            for page in pdf.pages:
-                extracted = page.extract_text() or ""
-                text += extracted
+        article_title = os.path.splitext(os.path.basename(article_path))[0]
+        queue = _get_job_queue()
+        job_id = queue.enqueue({
+            "article_path": open_path,
+            "author": author,
+            "style": style,
+            "save_dir": os.path.dirname(os.path.abspath(open_path)),
+            "article_title": article_title,
+            "mode": mode,
+            "carousel": bool(carousel),
+        })
 
-        graph = Graph().graph
-        config = {"configurable": {"thread_id": "gradio"}}
-        result = graph.invoke({"article": text}, config=config)
+        job = None
+        timeout = float(os.getenv("JOB_TIMEOUT_SECONDS", DEFAULT_JOB_TIMEOUT))
+        try:
+            for job in queue.watch(job_id, timeout=timeout):
+                if job["status"] not in TERMINAL_STATUSES:
+                    yield _status_only(_describe_job(job))
+        except TimeoutError:
+            # Nobody is waiting for the result any more, so a job still queued must not spend tokens later
+            if queue.cancel(job_id, f"Cancelled: not started within {timeout:.0f} seconds."):
+                yield _status_only(f"Error: no worker picked up the job within {timeout:.0f} seconds. "
+                                   "Check that workers are running (WORKER_CONCURRENCY or python -m src.worker).")
+            else:
+                yield _status_only(f"Error: the job did not finish within {timeout:.0f} seconds.")
+            return
 
-        caption = result.get("insta_caption") or ""
+        if job is None or job["status"] == FAILED:
+            yield _status_only(f"Error: {job['error'] if job else 'job disappeared'}")
+            return
 
-        quotes_obj = result.get("quotes")
-        quotes = quotes_obj.quotes if hasattr(quotes_obj, "quotes") else quotes_obj
-
-        image_paths = []
-        article_title = os.path.splitext(os.path.basename(article_path))[0]
-        byline = f"-{author}" if author and not author.startswith("-") else (author or "-Oren Hartstein")
-        save_dir = os.path.dirname(os.path.abspath(open_path))
-        for idx, quote in enumerate(quotes, start=1):
-            title = f"{article_title}_{idx}"
-            # Choose the appropriate generation function based on style
-            if style == "The Free Press":
-                fp_generate_image(quote, byline, title, save_dir=save_dir)
-            else:  # Default to original style
-                generate_image(quote, byline, title, save_dir=save_dir)
-            image_paths.append(os.path.abspath(os.path.join(save_dir, f"{title}.png")))
-
-        # Save caption to a .txt file and include in downloadable files/state (not gallery)
-        caption_path = os.path.abspath(os.path.join(save_dir, f"{article_title}_caption.txt"))
-        try:
-            with open(caption_path, "w", encoding="utf-8") as f:
-                f.write(caption)
-        except Exception:
-            caption_path = None
+        result = job["result"]
+        caption = result.get("caption") or ""
+        image_paths = result.get("image_paths") or []
+        caption_path = result.get("caption_path")
+        bundle_path = result.get("bundle_path")
 
         download_paths = image_paths.copy()
         if caption_path and os.path.isfile(caption_path):
             download_paths.append(caption_path)
+        if bundle_path and os.path.isfile(bundle_path):
+            download_paths.append(bundle_path)
 
         yield (
             gr.update(value=image_paths, visible=True),
@@ -95,17 +140,10 @@ def run_generation(article_path: str, author: str, style: str = "Original"):
             gr.update(visible=True),
         )
     except Exception as exc:  # noqa: BLE001 - surface error to user
-        yield (
-            gr.update(value=[], visible=False),
-            gr.update(value="", visible=False),
-            gr.update(value=[], visible=False),
-            gr.update(value=f"Error: {exc}", visible=True),
-            [],
-            gr.update(visible=False),
-        )
+        yield _status_only(f"Error: {exc}")
 
 
-def create_zip(image_paths: list):
+def create_zip(image_paths: list, request: gr.Request = None):
     if not image_paths:
         return None
     safe_paths = [p for p in image_paths if p and os.path.isfile(p)]
@@ -134,16 +172,25 @@ def create_zip(image_paths: list):
         # No file to download; returning None keeps the button without triggering a download
         return None
     
-    # If no folder selected (e.g., non-macOS), fall back to creating a zip in CWD
-    zip_name = "images.zip"
-    with zipfile.ZipFile(zip_name, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for p in safe_paths:
-            zf.write(p, arcname=os.path.basename(p))
-    return os.path.abspath(zip_name)
+    # If no folder selected (e.g., non-macOS), fall back to a zip in this session's directory
+    store = _get_artifact_store()
+    zip_path = os.path.join(store.session_dir(_session_id(request)), "images.zip")
+    build_zip(safe_paths, zip_path)
+    return zip_path
+
+
+def cleanup_session(request: gr.Request):
+    """Remove a session's files once its browser tab closes."""
+    _get_artifact_store().remove_session(_session_id(request), keep=_active_job_paths())
 
 
 def launch_app():
-    with gr.Blocks(title="AI Post Generator", analytics_enabled=False) as demo:
+    store = _get_artifact_store()
+    # Gradio copies every returned image and zip into its own cache; expire those copies on the
+    # same schedule as the session directories so both halves of the footprint stay bounded
+    cache_age = int(store.max_age_seconds)
+    with gr.Blocks(title="AI Post Generator", analytics_enabled=False,
+                   delete_cache=(min(cache_age, 3600), cache_age)) as demo:
         gr.Markdown("## AI Post Generator\nUpload a PDF article and click Generate.")
         with gr.Row():
             article_input = gr.File(label="Article PDF", file_types=[".pdf"], file_count="single", type="filepath")
@@ -158,6 +205,17 @@ def launch_app():
                 value="Original",
                 info="Choose the visual style for your posts"
             )
+            mode_input = gr.Dropdown(
+                label="Generation Mode",
+                choices=[("Standard (3 calls)", "standard"), ("Single call (fewer tokens)", "single_call")],
+                value="standard",
+                info="Single call asks for quotes, summary and caption in one request: fewer tokens, similar wait"
+            )
+            carousel_input = gr.Checkbox(
+                label="Carousel",
+                value=False,
+                info="Add a cover and closing slide and use one font size for every slide"
+            )
         generate_btn = gr.Button("Generate")
         with gr.Row():
             gallery = gr.Gallery(label="Generated Images", columns=3, visible=False)
@@ -170,14 +228,31 @@ def launch_app():
 
         generate_btn.click(
             fn=run_generation,
-            inputs=[article_input, author_input, style_input],
+            inputs=[article_input, author_input, style_input, mode_input, carousel_input],
             outputs=[gallery, caption_box, files, status, paths_state, download_all_btn],
         )
         download_all_btn.click(fn=create_zip, inputs=paths_state, outputs=download_all_btn)
+        demo.unload(cleanup_session)
+
+    # Heavy work runs in worker processes; set WORKER_CONCURRENCY=0 when workers are run separately
+    # (python -m src.worker) against the same JOB_DB_PATH.
+    concurrency = int(os.getenv("WORKER_CONCURRENCY", 1))
+    pool = WorkerPool(concurrency=concurrency).start() if concurrency > 0 else None
 
+    # Jobs that survived a restart still need their uploads and output directories
+    store.evict(keep=_active_job_paths())
+
+    # Handlers now mostly wait on the job queue, so many can be in flight at once
+    handler_limit = int(os.getenv("GRADIO_CONCURRENCY", 16))
     # Use PORT environment variable for deployment platforms like Fly.io
     port = int(os.getenv("PORT", 7860))
-    demo.queue().launch(server_name="0.0.0.0", server_port=port)
+    try:
+        # Outputs are served from ARTIFACT_ROOT, which Gradio only allows by default under the temp or working dir
+        demo.queue(default_concurrency_limit=handler_limit).launch(server_name="0.0.0.0", server_port=port,
+                                                                   allowed_paths=[store.root])
+    finally:
+        if pool is not None:
+            pool.stop()
 
 
 if __name__ == "__main__":
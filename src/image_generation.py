@@ -1,6 +1,7 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
 import re
+from functools import lru_cache
 
 
 def _wrap_text(draw, text, font, max_width):
@@ -69,7 +70,68 @@ def _ensure_wrapped_in_double(text: str) -> str:
         return '"' + stripped.strip('“”').strip('"') + '"'
     return '"' + stripped + '"'
 
-def generate_image(quote, byline, title, save_dir=None):
+def _logo_path():
+    # Resolve logo path relative to project root (parent of this file's directory)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    return os.path.join(project_root, "sundial_logo_white.png")
+
+@lru_cache(maxsize=8)
+def _logo_mask(logo_width):
+    """
+    Alpha channel of the logo resized to ``logo_width``. Loaded once per process and
+    shared by every slide and color, since the tint is applied when pasting.
+    """
+    with Image.open(_logo_path()) as logo:
+        logo = logo.convert("RGBA")
+    aspect_ratio = logo.width / logo.height
+    logo_height = int(logo_width / aspect_ratio)
+    return logo.resize((logo_width, logo_height), Image.Resampling.LANCZOS).getchannel("A")
+
+# Quote font size, and the vertical room the centered quote has between the logo and the byline
+QUOTE_FONT_SIZE = 50
+MAX_TEXT_HEIGHT = 560
+
+@lru_cache(maxsize=16)
+def _load_fonts(main_size=QUOTE_FONT_SIZE):
+    # Load a font (You'll need a font file, e.g., .ttf or .otf)
+    try:
+        font_path = "DejaVuSerif.ttf"
+        font_main = ImageFont.truetype(font_path, size=main_size)
+        font_byline = ImageFont.truetype(font_path, size=45)
+
+    except IOError:
+        print("Font file not found. Using default font.")
+        font_main = ImageFont.load_default()
+        font_byline = ImageFont.load_default()
+    return font_main, font_byline
+
+def _slide_text(text, wrap_quote=True):
+    return _ensure_wrapped_in_double(_normalize_quotes(text)) if wrap_quote else text
+
+def fit_font_size(texts, max_size=QUOTE_FONT_SIZE, min_size=28, wrap_quote=True):
+    """
+    Largest font size (down to ``min_size``) at which every text fits between the logo
+    and the byline, so a set of slides can share one size.
+    """
+    draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    padding = 100
+    for size in range(max_size, min_size, -2):
+        font_main, _ = _load_fonts(size)
+        if all(
+            sum(draw.textbbox((0, 0), line, font=font_main)[3]
+                for line in _wrap_text(draw, _slide_text(text, wrap_quote), font_main, 1080 - padding * 2))
+            <= MAX_TEXT_HEIGHT
+            for text in texts
+        ):
+            return size
+    return min_size
+
+def generate_image(quote, byline, title, save_dir=None, pnginfo=None, font_size=None, wrap_quote=True):
+    """
+    Render one slide. ``font_size`` overrides the quote font size and ``wrap_quote=False``
+    draws the text as-is (used for carousel cover and closing slides).
+    """
 
     # 1. Define image dimensions and background color
     img_width = 1080  # Standard Instagram post aspect ratio (square)
@@ -83,20 +145,12 @@ def generate_image(quote, byline, title, save_dir=None):
     draw = ImageDraw.Draw(image)
 
     # 4. Define the text to display. This is a long paragraph to match the image.
-    long_text = _ensure_wrapped_in_double(_normalize_quotes(quote))
+    long_text = _slide_text(quote, wrap_quote)
     byline_text = "-Oren Hartstein"
     logo_text = "Columbia Sundial"
 
-    # 5. Load a font (You'll need a font file, e.g., .ttf or .otf)
-    try:
-        font_path = "DejaVuSerif.ttf"
-        font_main = ImageFont.truetype(font_path, size=50)
-        font_byline = ImageFont.truetype(font_path, size=45)
-        
-    except IOError:
-        print("Font file not found. Using default font.")
-        font_main = ImageFont.load_default()
-        font_byline = ImageFont.load_default()
+    # 5. Load the fonts (cached per size)
+    font_main, font_byline = _load_fonts(font_size or QUOTE_FONT_SIZE)
 
     # 6. Wrap the main text based on the image width with some padding
     padding = 100
@@ -132,29 +186,19 @@ def generate_image(quote, byline, title, save_dir=None):
     byline_color = (242, 210, 65)  # Warm golden yellow
     draw.text((byline_x, byline_y), formatted_byline, fill=byline_color, font=font_byline)
 
-    # 10. Load and place the logo image at the top center
-    # Resolve logo path relative to project root (parent of this file's directory)
+    # 10. Place the logo image at the top center
+    logo_path = _logo_path()
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(script_dir)
-        logo_path = os.path.join(project_root, "sundial_logo_white.png")
-
-        logo = Image.open(logo_path).convert("RGBA")
-        logo_width = 200 # Set a desired width for the logo
-        aspect_ratio = logo.width / logo.height
-        logo_height = int(logo_width / aspect_ratio)
-
-        logo = logo.resize((logo_width, logo_height), Image.Resampling.LANCZOS)
+        logo_mask = _logo_mask(200)  # Desired width for the logo
 
         # Position the logo at the top center with padding
-        logo_x = int((img_width - logo.width) / 2)
+        logo_x = int((img_width - logo_mask.width) / 2)
         logo_y = int(max(0, padding - 60))
 
-        # Recolor the logo to match the byline color while preserving transparency
-        alpha = logo.split()[-1]
-        colored_logo = Image.new("RGBA", logo.size, byline_color + (255,))
-        colored_logo.putalpha(alpha)
-        image.paste(colored_logo, (logo_x, logo_y), colored_logo)
+        # Recolor the logo to match the byline color while preserving transparency by
+        # painting the flat color through the cached alpha mask (no per-slide logo images)
+        box = (logo_x, logo_y, logo_x + logo_mask.width, logo_y + logo_mask.height)
+        image.paste(byline_color, box, logo_mask)
 
     except FileNotFoundError:
         print(f"Logo file not found at: {logo_path}. Skipping logo placement.")
@@ -169,5 +213,7 @@ def generate_image(quote, byline, title, save_dir=None):
             # If directory creation fails, fall back to current directory
             save_dir = None
     output_path = os.path.join(save_dir, title + ".png") if save_dir else (title + ".png")
-    image.save(output_path)
+    # pnginfo carries metadata such as the render key used to skip unchanged slides
+    image.save(output_path, pnginfo=pnginfo)
     print(f"Image {title} generated successfully!")
+    return output_path
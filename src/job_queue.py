@@ -0,0 +1,260 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+TERMINAL_STATUSES = (DONE, FAILED)
+
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_MAX_ATTEMPTS = 3
+# Backoff before a requeued job may run again: doubles per attempt, jittered, capped
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    progress TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker_id TEXT,
+    lease_expires REAL,
+    available_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt of a job that has run ``attempts`` times."""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def default_db_path():
+    """Location of the queue database; point ``JOB_DB_PATH`` at a persistent volume in production."""
+    return os.getenv("JOB_DB_PATH") or os.path.join(tempfile.gettempdir(), "ai_post_jobs.sqlite3")
+
+
+class JobQueue:
+    """
+    A small durable job queue stored in a local SQLite file.
+
+    Workers claim jobs with a time-limited lease and keep it alive with heartbeats.
+    If a worker dies (or the machine restarts) its lease expires and the job is
+    handed to the next worker, up to ``max_attempts`` times.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_db_path()
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "available_at" not in columns:
+                # Databases created before retries were delayed
+                conn.execute("ALTER TABLE jobs ADD COLUMN available_at REAL")
+
+    @contextmanager
+    def _connect(self):
+        # A fresh connection per operation keeps the queue safe to share across threads and processes
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, payload, kind="generate", max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Add a job and return its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(payload), max_attempts, now, now),
+            )
+        return job_id
+
+    def _recover_expired(self, conn, now):
+        # Jobs whose worker stopped heartbeating either go back to the queue or, when out of attempts, fail
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, worker_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts",
+            (FAILED, "Worker stopped responding too many times.", now, RUNNING, now),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = ?, progress = ?, worker_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = ? AND lease_expires < ?",
+            (QUEUED, "Retrying after worker interruption...", now, RUNNING, now),
+        )
+
+    def claim(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """
+        Atomically take the oldest queued job that is due (not waiting out a retry delay),
+        or return None if there is nothing to do.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            self._recover_expired(conn, now)
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND (available_at IS NULL OR available_at <= ?) "
+                "ORDER BY created_at LIMIT 1", (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?",
+                (RUNNING, worker_id, now + lease_seconds, now, row["id"]),
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return _row_to_job(job)
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS, progress=None):
+        """Extend the lease on a running job. Returns False if the worker no longer owns it."""
+        now = time.time()
+        with self._connect() as conn:
+            if progress is None:
+                cur = conn.execute(
+                    "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                    "WHERE id = ? AND worker_id = ? AND status = ?",
+                    (now + lease_seconds, now, job_id, worker_id, RUNNING),
+                )
+            else:
+                cur = conn.execute(
+                    "UPDATE jobs SET lease_expires = ?, progress = ?, updated_at = ? "
+                    "WHERE id = ? AND worker_id = ? AND status = ?",
+                    (now + lease_seconds, progress, now, job_id, worker_id, RUNNING),
+                )
+        return cur.rowcount == 1
+
+    def complete(self, job_id, worker_id, result):
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, progress = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = ?",
+                (DONE, json.dumps(result), "Done.", now, job_id, worker_id, RUNNING),
+            )
+        return cur.rowcount == 1
+
+    def fail(self, job_id, worker_id, error, retry=False, delay=None):
+        """
+        Record a failure. With ``retry`` the job is requeued while it has attempts left, and is
+        not claimed again for ``delay`` seconds (default: ``retry_delay`` of its attempts).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker_id = ? AND status = ?",
+                (job_id, worker_id, RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            status = QUEUED if retry and row["attempts"] < row["max_attempts"] else FAILED
+            available_at = None
+            if status == QUEUED:
+                available_at = now + (retry_delay(row["attempts"]) if delay is None else delay)
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, worker_id = NULL, lease_expires = NULL, available_at = ?, "
+                "updated_at = ? WHERE id = ?",
+                (status, str(error), available_at, now, job_id),
+            )
+        return True
+
+    def cancel(self, job_id, reason="Cancelled."):
+        """
+        Fail a job that no worker has claimed yet, so it never runs. Returns False if it is
+        already running or finished.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = NULL, updated_at = ? WHERE id = ? AND status = ?",
+                (FAILED, reason, now, job_id, QUEUED),
+            )
+        return cur.rowcount == 1
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row is not None else None
+
+    def jobs(self, status=None):
+        """Every job (or only those with ``status``), oldest first."""
+        with self._connect() as conn:
+            if status is None:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs WHERE status = ? ORDER BY created_at", (status,)).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def position(self, job_id):
+        """Number of queued jobs ahead of ``job_id`` (0 when it is next or already running)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS ahead FROM jobs WHERE status = ? "
+                "AND created_at < (SELECT created_at FROM jobs WHERE id = ?)",
+                (QUEUED, job_id),
+            ).fetchone()
+        return row["ahead"]
+
+    def watch(self, job_id, poll_interval=0.5, timeout=None):
+        """
+        Yield the job each time its status or progress changes, finishing once it
+        reaches a terminal status. Raises TimeoutError if ``timeout`` seconds pass first.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        last_seen = None
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                raise KeyError(f"Unknown job: {job_id}")
+            if job["status"] == QUEUED:
+                job["position"] = self.position(job_id)
+            seen = (job["status"], job["progress"], job.get("position"))
+            if seen != last_seen:
+                last_seen = seen
+                yield job
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} did not finish within {timeout} seconds")
+            time.sleep(poll_interval)
+
+
+def _row_to_job(row):
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
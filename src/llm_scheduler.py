@@ -0,0 +1,438 @@
+import os
+import time
+import uuid
+import random
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Output tokens reserved per call before the real usage is known; the difference is settled afterwards
+DEFAULT_OUTPUT_TOKENS = 600
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUSES = {408, 409, 429}
+# Client errors raised before a status exists (dropped connections, read timeouts)
+RETRYABLE_ERRORS = ("APIConnectionError", "APITimeoutError")
+# Seconds a shared concurrency slot stays held if its process dies mid-call (above the client's timeout)
+SLOT_LEASE_SECONDS = 660
+# Seconds between checks while every shared slot is taken
+SLOT_POLL_SECONDS = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS llm_slots (
+    id TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+class LLMRateLimitError(RuntimeError):
+    """Raised when an LLM call still fails with a retryable error after every retry."""
+
+    def __init__(self, model, attempts, cause):
+        self.model = model
+        self.attempts = attempts
+        status = getattr(cause, "status_code", None)
+        reason = "rate limited" if status == 429 else f"unavailable ({type(cause).__name__})"
+        super().__init__(f"OpenAI {model} {reason} after {attempts} attempts; try again in a minute")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket holding up to ``capacity`` tokens, refilled continuously at
+    ``capacity / period`` per second. ``acquire`` blocks until the requested amount is available.
+    """
+
+    def __init__(self, capacity, period=60.0, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1):
+        """Take ``amount`` tokens, waiting as needed. Returns the seconds spent waiting."""
+        # A single request larger than the bucket could never fit; let it drain the bucket instead
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    def settle(self, amount):
+        """Charge (or refund, if negative) ``amount`` tokens after the fact; the balance may go negative."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+    @property
+    def available(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class _LocalSlots:
+    """Per-process concurrency cap with the same interface as ``SharedSlots``."""
+
+    def __init__(self, limit):
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def acquire(self):
+        self._semaphore.acquire()
+
+    def release(self, slot=None):
+        self._semaphore.release()
+
+
+class _SharedStore:
+    """Connections to the SQLite file holding limits shared by every process that opens it."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        # Same pattern as the job queue: a fresh connection per operation, writes serialised by BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+class SharedTokenBucket:
+    """
+    ``TokenBucket`` whose balance lives in a SQLite row, so every process using the same
+    database (UI workers, CLI runs) draws from one budget.
+    """
+
+    def __init__(self, store, name, capacity, period=60.0, clock=time.time, sleep=time.sleep):
+        self.store = store
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self._clock = clock
+        self._sleep = sleep
+
+    def _balance(self, conn):
+        now = self._clock()
+        row = conn.execute("SELECT tokens, updated FROM llm_buckets WHERE name = ?", (self.name,)).fetchone()
+        if row is None:
+            return self.capacity, now
+        tokens, updated = row
+        return min(self.capacity, tokens + max(0.0, now - updated) * self.rate), now
+
+    def _store(self, conn, tokens, now):
+        conn.execute("INSERT OR REPLACE INTO llm_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                     (self.name, tokens, now))
+
+    def acquire(self, amount=1):
+        """Take ``amount`` tokens, waiting as needed. Returns the seconds spent waiting."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self.store.transaction() as conn:
+                tokens, now = self._balance(conn)
+                if tokens >= amount:
+                    self._store(conn, tokens - amount, now)
+                    return waited
+                delay = (amount - tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    def settle(self, amount):
+        """Charge (or refund, if negative) ``amount`` tokens after the fact; the balance may go negative."""
+        with self.store.transaction() as conn:
+            tokens, now = self._balance(conn)
+            self._store(conn, min(self.capacity, tokens - amount), now)
+
+    @property
+    def available(self):
+        with self.store.transaction() as conn:
+            return self._balance(conn)[0]
+
+
+class SharedSlots:
+    """
+    Cross-process cap of ``limit`` concurrent calls for one model. Each holder is a row with
+    a lease, so a process that dies mid-call frees its slot after ``lease`` seconds.
+    """
+
+    def __init__(self, store, model, limit, lease=SLOT_LEASE_SECONDS, clock=time.time, sleep=time.sleep):
+        self.store = store
+        self.model = model
+        self.limit = limit
+        self.lease = lease
+        self._clock = clock
+        self._sleep = sleep
+
+    def acquire(self):
+        """Wait for a free slot and return its id (pass it to ``release``)."""
+        slot = uuid.uuid4().hex
+        while True:
+            with self.store.transaction() as conn:
+                now = self._clock()
+                conn.execute("DELETE FROM llm_slots WHERE expires < ?", (now,))
+                held = conn.execute("SELECT COUNT(*) FROM llm_slots WHERE model = ?", (self.model,)).fetchone()[0]
+                if held < self.limit:
+                    conn.execute("INSERT INTO llm_slots (id, model, expires) VALUES (?, ?, ?)",
+                                 (slot, self.model, now + self.lease))
+                    return slot
+            self._sleep(SLOT_POLL_SECONDS * (1 + random.random()))
+
+    def release(self, slot):
+        with self.store.transaction() as conn:
+            conn.execute("DELETE FROM llm_slots WHERE id = ?", (slot,))
+
+
+def is_retryable(exc):
+    """Whether an OpenAI client error is transient (429, 5xx, timeouts, dropped connections)."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUSES or status >= 500
+    return type(exc).__name__ in RETRYABLE_ERRORS
+
+
+def retry_after_seconds(exc):
+    """The server's requested wait from ``retry-after-ms``/``retry-after`` headers, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return float(headers[name]) * scale
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def _env_int(name, default=None):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+class _ModelMetrics:
+    __slots__ = ("calls", "succeeded", "failed", "retries", "rate_limited", "throttle_seconds",
+                 "queue_seconds", "latency_seconds", "max_latency_seconds", "in_flight", "max_in_flight")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class LLMScheduler:
+    """
+    Gate for every LLM call: per-model token buckets for requests (``rpm``) and tokens
+    (``tpm``) per minute, a per-model cap on concurrent calls, and retries with jittered
+    exponential backoff on rate limits and transient errors. ``rpm``/``tpm`` of None disable
+    that bucket. With ``db_path`` the buckets and the concurrency cap are kept in that SQLite
+    file and shared by every process using it; otherwise they only cover this process.
+    Per-model counters (for this process) are available from ``metrics()``.
+    """
+
+    def __init__(self, rpm=None, tpm=None, max_concurrency=8, max_retries=5, base_delay=1.0, max_delay=30.0,
+                 db_path=None, clock=time.monotonic, sleep=time.sleep, rng=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self.db_path = db_path
+        self._store = None
+        self._lock = threading.Lock()
+        self._models = {}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Configure from ``LLM_RPM``, ``LLM_TPM``, ``LLM_MAX_CONCURRENCY`` and ``LLM_MAX_RETRIES``.
+        Limits are shared through ``LLM_LIMITS_DB``, defaulting to the job queue's database
+        so that every worker process counts against the same budget.
+        """
+        from .job_queue import default_db_path
+
+        return cls(
+            rpm=_env_int("LLM_RPM"),
+            tpm=_env_int("LLM_TPM"),
+            max_concurrency=_env_int("LLM_MAX_CONCURRENCY", 8),
+            max_retries=_env_int("LLM_MAX_RETRIES", 5),
+            db_path=os.getenv("LLM_LIMITS_DB") or default_db_path(),
+        )
+
+    def _bucket(self, name, capacity):
+        if not capacity:
+            return None
+        if self.db_path is None:
+            return TokenBucket(capacity, clock=self._clock, sleep=self._sleep)
+        return SharedTokenBucket(self._shared_store(), name, capacity, sleep=self._sleep)
+
+    def _slots(self, model):
+        if not self.max_concurrency:
+            return None
+        if self.db_path is None:
+            return _LocalSlots(self.max_concurrency)
+        return SharedSlots(self._shared_store(), model, self.max_concurrency, sleep=self._sleep)
+
+    def _shared_store(self):
+        # Opened on first use, so importing the scheduler never touches the database
+        if self._store is None:
+            self._store = _SharedStore(self.db_path)
+        return self._store
+
+    def _model(self, model):
+        with self._lock:
+            state = self._models.get(model)
+            if state is None:
+                state = {
+                    "requests": self._bucket(f"{model}:requests", self.rpm),
+                    "tokens": self._bucket(f"{model}:tokens", self.tpm),
+                    "slots": self._slots(model),
+                    "metrics": _ModelMetrics(),
+                }
+                self._models[model] = state
+            return state
+
+    def backoff(self, attempt, exc=None):
+        """Full-jitter delay before retry number ``attempt`` (1-based), never shorter than Retry-After."""
+        delay = self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        retry_after = retry_after_seconds(exc) if exc is not None else None
+        return max(delay, min(retry_after, self.max_delay)) if retry_after else delay
+
+    def call(self, model, fn, tokens=0, usage=None):
+        """
+        Run ``fn()`` for ``model`` within the limits and return its result.
+
+        ``tokens`` is the estimated total (input + output) charged to the token bucket up
+        front; ``usage(result)`` may return the actual total, and the difference is settled.
+        Retryable errors are retried up to ``max_retries`` times, then raised as
+        ``LLMRateLimitError``; other errors propagate immediately.
+        """
+        state = self._model(model)
+        metrics = state["metrics"]
+        attempt = 0
+        while True:
+            attempt += 1
+            result, error = self._attempt(state, fn, tokens)
+            if error is None:
+                break
+            if not is_retryable(error) or attempt > self.max_retries:
+                with self._lock:
+                    metrics.failed += 1
+                if is_retryable(error):
+                    raise LLMRateLimitError(model, attempt, error) from error
+                raise error
+            # The concurrency slot is already released, so other calls proceed during the backoff
+            delay = self.backoff(attempt, error)
+            logger.warning("LLM call to %s failed (%s); retry %d/%d in %.2fs",
+                           model, type(error).__name__, attempt, self.max_retries, delay)
+            with self._lock:
+                metrics.retries += 1
+            self._sleep(delay)
+
+        with self._lock:
+            metrics.succeeded += 1
+        if state["tokens"] is not None and usage is not None:
+            actual = usage(result)
+            if actual is not None:
+                state["tokens"].settle(actual - tokens)
+        return result
+
+    def _attempt(self, state, fn, tokens):
+        """One throttled call; returns ``(result, None)`` or ``(None, exception)``."""
+        metrics = state["metrics"]
+        started = self._clock()
+        if state["requests"] is not None:
+            state["requests"].acquire(1)
+        if state["tokens"] is not None and tokens:
+            state["tokens"].acquire(tokens)
+        throttled = self._clock()
+        slot = state["slots"].acquire() if state["slots"] is not None else None
+        try:
+            with self._lock:
+                metrics.calls += 1
+                metrics.throttle_seconds += throttled - started
+                metrics.queue_seconds += self._clock() - throttled
+                metrics.in_flight += 1
+                metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+            call_started = self._clock()
+            try:
+                return fn(), None
+            except Exception as exc:  # noqa: BLE001 - classified by the caller
+                with self._lock:
+                    metrics.rate_limited += getattr(exc, "status_code", None) == 429
+                if state["tokens"] is not None and tokens:
+                    # A rejected request consumed no tokens; the retry charges its estimate again
+                    state["tokens"].settle(-tokens)
+                return None, exc
+            finally:
+                elapsed = self._clock() - call_started
+                with self._lock:
+                    metrics.in_flight -= 1
+                    metrics.latency_seconds += elapsed
+                    metrics.max_latency_seconds = max(metrics.max_latency_seconds, elapsed)
+        finally:
+            if state["slots"] is not None:
+                state["slots"].release(slot)
+
+    def metrics(self):
+        """Snapshot of per-model counters (calls, retries, 429s, wait and latency seconds, ...)."""
+        with self._lock:
+            return {model: state["metrics"].as_dict() for model, state in self._models.items()}
+
+
+def metrics_delta(before, after):
+    """
+    Counters accumulated between two ``metrics()`` snapshots, summed over models; gauges
+    (``in_flight``) and maxima are left out. Used to report one article's LLM traffic.
+    """
+    totals = {name: 0 for name in _ModelMetrics.__slots__ if name != "in_flight" and not name.startswith("max_")}
+    for model, counters in after.items():
+        previous = before.get(model, {})
+        for name in totals:
+            totals[name] += counters[name] - previous.get(name, 0)
+    return {name: round(value, 3) if isinstance(value, float) else value for name, value in totals.items()}
+
+
+# Process-wide scheduler shared by every node; its limits are shared with other processes
+# (workers, CLI runs) through the queue database
+scheduler = LLMScheduler.from_env()
@@ -1,13 +1,25 @@
 import os
-import pdfplumber
+import sys
+import json
+import time
 import logging
 import argparse
-from .graph import Graph
-from dotenv import load_dotenv
-from .image_generation import generate_image
-from .fp_post_generation import generate_image as fp_generate_image
+from .constants import STYLES, MODES, DEFAULT_BYLINE
 
-def main(article_path=None, output_dir=None, style="Original"):
+# Only lightweight modules are imported at the top: the LLM stack and PDF parsing are loaded
+# inside main() so that `render` (and --help) never pay for them.
+
+
+def main(article_path=None, output_dir=None, style="Original", mode="standard", force=False, carousel=False):
+    from dotenv import load_dotenv
+    from .graph import Graph
+    from .token_accounting import ledger
+    from .nodes import scheduler
+    from .llm_scheduler import metrics_delta
+    from .pipeline import extract_article_text
+    from .render_cache import render_if_changed
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper())
     logging.getLogger("pdfminer").setLevel(logging.ERROR)
     load_dotenv()
     default_article_path = "Conservatives in Academia.pdf"
@@ -17,16 +29,21 @@ def main(article_path=None, output_dir=None, style="Original"):
             article_path = user_input or default_article_path
         except EOFError:
             article_path = default_article_path
-    text = ""
-    with pdfplumber.open(article_path) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text()
+    timings = {}
+    started = time.perf_counter()
+    text = extract_article_text(article_path)
+    timings["extract"] = time.perf_counter() - started
 
-    graph = Graph().graph
+    started = time.perf_counter()
+    llm_before = scheduler.metrics()
+    graph = Graph(mode=mode).graph
     config = {"configurable": {"thread_id": "3"}}
     result = graph.invoke({"article": text}, config=config)
+    timings["graph"] = time.perf_counter() - started
     caption = result["insta_caption"]
-    
+    tokens = ledger.pop_article_totals(text)
+    llm = metrics_delta(llm_before, scheduler.metrics())
+
     print("SUMMARY")
     print('='*150)
     print(result["summary"])
@@ -44,23 +61,113 @@ def main(article_path=None, output_dir=None, style="Original"):
     except Exception:
         # Non-fatal if caption fails to save; continue with image generation
         pass
-    for idx, quote in enumerate(result["quotes"].quotes, start=1):
-        print(quote)    
+    quotes = result["quotes"].quotes
+    started = time.perf_counter()
+    for idx, quote in enumerate(quotes, start=1):
+        print(quote)
         print('-'*100)
-        # Choose the appropriate generation function based on style
-        if style == "The Free Press":
-            fp_generate_image(quote, "-Oren Hartstein", f"{article_title}_{idx}", save_dir=output_dir)
-        else:  # Default to original style
-            generate_image(quote, "-Oren Hartstein", f"{article_title}_{idx}", save_dir=output_dir)
+        if carousel:
+            continue
+        # Slides whose quote, byline and style are unchanged since the last run are not rewritten
+        _, rendered = render_if_changed(quote, DEFAULT_BYLINE, f"{article_title}_{idx}", save_dir=output_dir,
+                                        style=style, force=force)
+        if not rendered:
+            print(f"Image {article_title}_{idx} unchanged, skipped.")
+    if carousel:
+        from .carousel import render_carousel
+
+        bundle = render_carousel(article_title, quotes, caption=caption, style=style, save_dir=output_dir,
+                                 force=force)
+        print(f"Carousel bundle: {bundle['bundle_path']}")
+    timings["render"] = time.perf_counter() - started
 
     print('='*150)
     print("INSTA CAPTION")
     print(caption)
+    if tokens:
+        print('='*150)
+        print(f"TOKENS: {tokens['input_tokens']} input over {tokens['calls']} calls "
+              f"(~{tokens['cacheable_tokens']} cacheable prefix, {tokens['uncached_tokens']} uncached; "
+              f"provider reported {tokens['provider_cached_tokens']} cached), {tokens['output_tokens']} output")
+    print(f"LLM: {llm['calls']} calls, {llm['retries']} retries, {llm['rate_limited']} rate limited, "
+          f"{llm['throttle_seconds']:.1f}s throttled")
+    print("TIMINGS: " + ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in timings.items()))
 
-if __name__ == "__main__":
+
+def render(quote, byline=DEFAULT_BYLINE, title="quote", output_dir=None, style="Original", force=False):
+    """Render a single slide without touching PDF parsing or the LLM stack."""
+    from .pipeline import format_byline
+    from .render_cache import render_if_changed
+
+    _, rendered = render_if_changed(quote, format_byline(byline), title, save_dir=output_dir, style=style, force=force)
+    if not rendered:
+        print(f"Image {title} unchanged, skipped.")
+
+
+def render_from_file(input_path, output_dir=None, byline=None, style="Original", manifest_path=None, workers=1,
+                     force=False):
+    """Bulk-render quotes from a JSON/JSONL file (or ``-`` for stdin) and write a manifest."""
+    from .render_batch import iter_records, render_records
+
+    output_dir = output_dir or os.getcwd()
+    stream = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    try:
+        records = iter_records(stream, byline=byline, style=style)
+        counts = render_records(records, output_dir, manifest_path=manifest_path, workers=workers, force=force)
+    except json.JSONDecodeError as exc:
+        # Records before the malformed one are rendered and in the manifest
+        print(f"Stopped: {input_path} is not valid JSON ({exc})", file=sys.stderr)
+        return False
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    rendered, unchanged, failed = counts
+    print(f"Rendered {rendered} slides ({unchanged} unchanged, {failed} failed) into {output_dir}")
+    return failed == 0
+
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Generate Instagram post images from an article PDF.")
     parser.add_argument("--article", "-a", help="Path to the article PDF", default=None)
     parser.add_argument("--output", "-o", help="Directory to save images (defaults to article's folder)", default=None)
-    parser.add_argument("--style", "-s", help="Post style to use", choices=["Original", "The Free Press"], default="Original")
-    args = parser.parse_args()
-    main(article_path=args.article, output_dir=args.output, style=args.style)
\ No newline at end of file
+    parser.add_argument("--style", "-s", help="Post style to use", choices=list(STYLES), default="Original")
+    parser.add_argument("--mode", "-m", help="LLM graph topology: three calls or one structured call",
+                        choices=list(MODES), default="standard")
+    parser.add_argument("--force", "-f", action="store_true", help="Re-render slides even if their inputs are unchanged")
+    parser.add_argument("--carousel", "-c", action="store_true",
+                        help="Render a carousel (cover, quotes, closing slide) bundled into one zip")
+    subparsers = parser.add_subparsers(dest="command")
+
+    render_parser = subparsers.add_parser("render", help="Render slides from existing quotes (no PDF or LLM calls)")
+    source = render_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--quote", "-q", help="Quote text to render")
+    source.add_argument("--input", "-i",
+                        help="JSON/JSONL file of quotes, bylines and titles ('-' reads stdin)")
+    render_parser.add_argument("--byline", "-b", default=None,
+                               help=f"Byline shown under the quote (default for records without one: {DEFAULT_BYLINE})")
+    render_parser.add_argument("--title", "-t", default="quote", help="Output file name (without .png) for --quote")
+    # Options shared with the top level default to SUPPRESS: a subparser's own defaults would
+    # overwrite values given before "render" (e.g. `--style "The Free Press" render ...`)
+    render_parser.add_argument("--output", "-o", default=argparse.SUPPRESS, help="Directory to save the images")
+    render_parser.add_argument("--style", "-s", choices=list(STYLES), default=argparse.SUPPRESS,
+                               help="Post style to use")
+    render_parser.add_argument("--manifest", default=None,
+                               help="Where to write the JSONL manifest (defaults to <output>/manifest.jsonl)")
+    render_parser.add_argument("--workers", "-w", type=int, default=1, help="Parallel render processes for --input")
+    render_parser.add_argument("--force", "-f", action="store_true", default=argparse.SUPPRESS,
+                               help="Re-render slides even if their inputs are unchanged")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    if args.command == "render" and args.input:
+        ok = render_from_file(args.input, output_dir=args.output, byline=args.byline, style=args.style,
+                              manifest_path=args.manifest, workers=args.workers, force=args.force)
+        raise SystemExit(0 if ok else 1)
+    elif args.command == "render":
+        render(args.quote, byline=args.byline or DEFAULT_BYLINE, title=args.title, output_dir=args.output,
+               style=args.style, force=args.force)
+    else:
+        main(article_path=args.article, output_dir=args.output, style=args.style, mode=args.mode, force=args.force,
+             carousel=args.carousel)
@@ -1,23 +1,48 @@
 from langchain_core.messages import SystemMessage, HumanMessage
 from .schemas import State
 from langchain_openai import ChatOpenAI
-from .schemas import Quotes
-from .prompts import pullout_sys_msg, summarizer_sys_msg, insta_caption_sys_msg
+from .schemas import Quotes, PostBundle
+from .prompts import sundial_sys_msg, pullout_sys_msg, summarizer_sys_msg, insta_caption_sys_msg, post_bundle_sys_msg
+from .token_accounting import ledger, message_token_counts
+from .llm_scheduler import scheduler, DEFAULT_OUTPUT_TOKENS
 
 def _get_chat_model(model = 'gpt-4o'):
     # Lazily construct the client so that importing this module doesn't require OPENAI_API_KEY.
-    return ChatOpenAI(model=model, temperature=0)
+    # Retries are left to the scheduler, which backs off across every concurrent call.
+    return ChatOpenAI(model=model, temperature=0, max_retries=0)
+
+def _total_tokens(raw):
+    usage = getattr(raw, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+def _call_llm(node, messages, model='gpt-4o', schema=None, article=None):
+    # Single place every node goes through, so calls are rate limited and token usage is logged per call
+    chat = _get_chat_model(model=model)
+    runnable = chat.with_structured_output(schema, include_raw=True) if schema is not None else chat
+    estimate = sum(message_token_counts(messages, model)) + DEFAULT_OUTPUT_TOKENS
+    out = scheduler.call(model, lambda: runnable.invoke(messages), tokens=estimate,
+                         usage=lambda out: _total_tokens(out["raw"] if schema is not None else out))
+    if schema is not None:
+        if out.get("parsing_error"):
+            raise out["parsing_error"]
+        raw, value = out["raw"], out["parsed"]
+    else:
+        raw = value = out
+    ledger.record(node, model, messages, usage=getattr(raw, "usage_metadata", None), article=article)
+    return value
+
+def _article_messages(article, task_msg):
+    # Preamble, then the article, then the task; re-running an article repeats the same prefix
+    return [sundial_sys_msg, HumanMessage(content=article), task_msg]
 
 def quote_generator(state: State):
     article = state["article"]
-    chat = _get_chat_model()
-    quote_llm = chat.with_structured_output(Quotes)
-    return {"quotes": quote_llm.invoke([pullout_sys_msg, HumanMessage(content=article)])}
+    quotes = _call_llm("quote_generator", _article_messages(article, pullout_sys_msg), schema=Quotes, article=article)
+    return {"quotes": quotes}
 
 def summarizer(state: State):
     article = state["article"]
-    chat = _get_chat_model(model="gpt-4o-mini")
-    resp = chat.invoke([summarizer_sys_msg, HumanMessage(content=article)])
+    resp = _call_llm("summarizer", _article_messages(article, summarizer_sys_msg), model="gpt-4o-mini", article=article)
     # Extract text if model returns a message object
     summary_text = getattr(resp, "content", resp)
     return {"summary": summary_text}
@@ -26,12 +51,23 @@ def insta_caption_generator(state: State):
     summary = state["summary"]
     quotes = state["quotes"].quotes if hasattr(state["quotes"], "quotes") else state["quotes"]
     quotes_text = "\n\n".join(quotes)
-    chat = _get_chat_model()
-    resp = chat.invoke([
+    # The task and its example captions are the same for every article, so they lead the prompt
+    resp = _call_llm("insta_caption_generator", [
+        sundial_sys_msg,
         insta_caption_sys_msg,
         HumanMessage(content=summary),
         HumanMessage(content=quotes_text),
-    ])
+    ], article=state["article"])
     insta_caption_text = getattr(resp, "content", resp)
     return {"insta_caption": insta_caption_text}
-    
+
+def post_bundle_generator(state: State):
+    # Single structured call returning quotes, summary and caption together (fewer calls and input tokens)
+    article = state["article"]
+    bundle = _call_llm("post_bundle_generator", _article_messages(article, post_bundle_sys_msg),
+                       schema=PostBundle, article=article)
+    return {
+        "quotes": Quotes(quotes=bundle.quotes),
+        "summary": bundle.summary,
+        "insta_caption": bundle.insta_caption,
+    }
@@ -0,0 +1,134 @@
+import os
+import time
+import logging
+from .constants import DEFAULT_BYLINE
+
+# Heavy dependencies (pdfplumber, langgraph/langchain, Pillow) are imported on first use so
+# that importing this module, and the CLI or UI built on it, stays fast on a cold start.
+
+logger = logging.getLogger(__name__)
+
+
+def extract_article_text(article_path):
+    """Return the concatenated text of every page in the PDF at ``article_path``."""
+    import pdfplumber
+
+    text = ""
+    with pdfplumber.open(article_path) as pdf:
+        for page in pdf.pages:
+            text += page.extract_text() or ""
+    return text
+
+
+def format_byline(author):
+    """Turn a bare author name into the dash-prefixed byline used on the slides."""
+    author = (author or "").strip()
+    if not author:
+        return DEFAULT_BYLINE
+    return author if author.startswith("-") else f"-{author}"
+
+
+def get_style_module(style):
+    """Return the renderer module (``generate_image``, ``fit_font_size``, ...) for a post style."""
+    if style == "The Free Press":
+        from . import fp_post_generation
+        return fp_post_generation
+    from . import image_generation
+    return image_generation
+
+
+def get_renderer(style):
+    """Return the ``generate_image`` function for the given post style."""
+    return get_style_module(style).generate_image
+
+
+def generate_posts(article_path, author="", style="Original", save_dir=None, article_title=None, progress=None,
+                   mode="standard", force=False, carousel=False):
+    """
+    Run the full post pipeline for one article: PDF extraction, the LLM graph and
+    slide rendering. Returns a JSON-serialisable dict so it can be stored as a job result.
+    ``progress`` is an optional callable receiving short status messages and ``mode``
+    selects the graph topology (see ``graph.MODES``). Slides whose inputs are unchanged
+    are left as they are unless ``force`` is set. With ``carousel`` the quotes are laid out
+    as one carousel (see ``carousel.render_carousel``) and ``bundle_path`` points at its zip.
+    ``llm`` holds this article's scheduler counters (calls, retries, 429s, seconds throttled).
+    """
+    from dotenv import load_dotenv
+    from .graph import Graph
+    # The scheduler the nodes call through (tests swap it for a process-local one)
+    from .nodes import scheduler
+    from .llm_scheduler import metrics_delta
+    from .token_accounting import ledger
+    from .render_cache import render_if_changed
+
+    report = progress or (lambda message: None)
+    load_dotenv()
+    timings = {}
+    if not article_title:
+        article_title = os.path.splitext(os.path.basename(article_path))[0]
+    if not save_dir:
+        save_dir = os.path.dirname(os.path.abspath(article_path))
+
+    report("Extracting article text...")
+    started = time.perf_counter()
+    text = extract_article_text(article_path)
+    timings["extract"] = time.perf_counter() - started
+
+    report("Generating quotes and caption...")
+    started = time.perf_counter()
+    llm_before = scheduler.metrics()
+    graph = Graph(mode=mode).graph
+    config = {"configurable": {"thread_id": article_title}}
+    result = graph.invoke({"article": text}, config=config)
+    timings["graph"] = time.perf_counter() - started
+    tokens = ledger.pop_article_totals(text)
+    llm = metrics_delta(llm_before, scheduler.metrics())
+    logger.info("LLM calls for %s: %s", article_title, llm)
+
+    caption = result.get("insta_caption") or ""
+    quotes_obj = result.get("quotes")
+    quotes = quotes_obj.quotes if hasattr(quotes_obj, "quotes") else list(quotes_obj or [])
+
+    report(f"Rendering {len(quotes)} images...")
+    started = time.perf_counter()
+    byline = format_byline(author)
+    image_paths = []
+    skipped = 0
+    bundle_path = None
+    if carousel:
+        from .carousel import render_carousel
+
+        bundle = render_carousel(article_title, quotes, caption=caption, byline=byline, style=style,
+                                 save_dir=save_dir, force=force)
+        image_paths = [slide["path"] for slide in bundle["slides"]]
+        skipped = sum(not slide["rendered"] for slide in bundle["slides"])
+        bundle_path = bundle["bundle_path"]
+    else:
+        for idx, quote in enumerate(quotes, start=1):
+            path, rendered = render_if_changed(quote, byline, f"{article_title}_{idx}", save_dir=save_dir,
+                                               style=style, force=force)
+            skipped += not rendered
+            image_paths.append(os.path.abspath(path))
+    timings["render"] = time.perf_counter() - started
+
+    caption_path = os.path.abspath(os.path.join(save_dir, f"{article_title}_caption.txt"))
+    try:
+        with open(caption_path, "w", encoding="utf-8") as f:
+            f.write(caption)
+    except Exception:
+        # Non-fatal if caption fails to save; images are still returned
+        caption_path = None
+
+    return {
+        "article_title": article_title,
+        "summary": result.get("summary") or "",
+        "quotes": quotes,
+        "caption": caption,
+        "image_paths": image_paths,
+        "caption_path": caption_path,
+        "skipped_images": skipped,
+        "bundle_path": bundle_path,
+        "timings": timings,
+        "tokens": tokens,
+        "llm": llm,
+    }
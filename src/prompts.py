@@ -1,22 +1,18 @@
 from langchain_core.messages import SystemMessage
-pullout_sys_msg = SystemMessage("""You are a helpful assistant that generates article pull-out quotes. 
-Each pull out quote should be 30-70 words and should capture the main themes of the article. 
-The pull out quotes MUST be direct quotations from the article. 
-DO NOT summarize or otherwise modify the direct quotations in any way. A quote can be 1-3 sentences long.
-DO NOT wrap the quote in quotation marks. Output the pure text of the quote.""")
 
-summarizer_sys_msg = SystemMessage("""You are a helpful assistant for the Columbia Sundial, a student publication. 
-Your task is to summarize the article provided by the user. 
-A summary should be 2-3 paragraphs and should capture all the main themes of the article. 
-Note that some articles are op-eds and others are informative""")
+# Constant text comes first so identical prefixes can be served from the provider's prompt cache
+# (1024-token minimum, per model; see token_accounting). Article calls send sundial_sys_msg, the
+# article, then the short task. The caption call sends sundial_sys_msg and the caption task with
+# its example captions (about 700 tokens, the only large constant block) before the per-article
+# summary and quotes. That prefix is still under the cache minimum, so across articles nothing is
+# cached today; re-running the same article within a few minutes reuses each call's prefix.
 
-insta_caption_sys_msg = SystemMessage("""You are a helpful assistant for the Columbia Sundial, a student publication. 
-Your task is to generate a caption for an instagram post advertising one of Sundial's articles.
-The caption should be 80-250 words, split into multiple lines and paragrpahs. 
-Use a summary of the article and a list of a few relevant quotes from the article to help you generate a good caption.
-Do not use hashtags or emojis in the caption.
-                           
-Here are some examples from other Sundial Articles: 
+sundial_sys_msg = SystemMessage("""You are a helpful assistant for the Columbia Sundial, a student publication. 
+You help the editors promote Sundial articles on Instagram by pulling out quotes, summarizing articles and writing captions.
+The user provides the article and then the specific task to perform, or the task followed by a summary and quotes from the article.
+Note that some articles are op-eds and others are informative.""")
+
+caption_examples = """Here are some example instagram captions from other Sundial Articles: 
 <example>
 On Saturday, February 22, the Columbia and Barnard Black History Month (BHM) Committee hosted Dr. Umar Johnson as the keynote speaker at its Winter Soulstice event in Lerner Hall. Dr. Umar, an activist and motivational speaker, has drawn criticism for his fierce opposition to homosexuality in the black community.
 
@@ -25,7 +21,7 @@ The Columbia and Barnard BHM Committee marketed the event as “a cross between
 Dr. Umar’s speech at the event did not directly address LGBTQ issues. However, several students told Sundial that they took issue with the committee’s decision to invite Dr. Umar as the keynote speaker because of his previous statements about LGBTQ people.
 
 🔗 Full article at the link in bio.
-<\example>
+</example>
                                       
 <example>
 Columbia’s dating scene leaves much to be desired— many students struggle to balance their high pressure environment with healthy relationships, often finding themselves romantically unfulfilled. Staff Writer Alexis Cartwright proposes that students are perpetuating unrealistic expectations. Perhaps casual dating has gotten an undeserved bad reputation. Perhaps casual dating is the solution to Columbia’s loneliness epidemic.
@@ -38,4 +34,36 @@ We are a student body focused on waiting instead of being—being in the moment,
 
 🔗 Full article at the link in bio.
 </example>
-""")
+"""
+
+pullout_sys_msg = SystemMessage("""Your task is to generate article pull-out quotes from the article above. 
+Each pull out quote should be 30-70 words and should capture the main themes of the article. 
+The pull out quotes MUST be direct quotations from the article. 
+DO NOT summarize or otherwise modify the direct quotations in any way. A quote can be 1-3 sentences long.
+DO NOT wrap the quote in quotation marks. Output the pure text of the quote.""")
+
+summarizer_sys_msg = SystemMessage("""Your task is to summarize the article above. 
+A summary should be 2-3 paragraphs and should capture all the main themes of the article.""")
+
+insta_caption_sys_msg = SystemMessage(f"""Your task is to generate a caption for an instagram post advertising the article.
+The caption should be 80-250 words, split into multiple lines and paragrpahs. 
+Use the summary of the article and the list of relevant quotes provided to help you generate a good caption.
+Follow the style of the example captions.
+Do not use hashtags or emojis in the caption.
+
+{caption_examples}""")
+
+post_bundle_sys_msg = SystemMessage(f"""Your task is to produce three things for the article above in a single response: pull-out quotes, a summary and an instagram caption.
+
+<quotes_instructions>
+{pullout_sys_msg.content}
+</quotes_instructions>
+
+<summary_instructions>
+{summarizer_sys_msg.content}
+</summary_instructions>
+
+<caption_instructions>
+{insta_caption_sys_msg.content}
+Write the caption last, using the summary and quotes you produced above.
+</caption_instructions>""")
@@ -0,0 +1,203 @@
+import os
+import re
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from .constants import DEFAULT_BYLINE
+
+_CHUNK_SIZE = 64 * 1024
+_decoder = json.JSONDecoder()
+
+
+def _iter_json_values(stream, chunk_size=_CHUNK_SIZE):
+    """
+    Yield JSON values from a text stream without reading it all into memory.
+
+    Accepts JSONL (one value per line), concatenated/pretty-printed values, or a single
+    top-level array, whose elements are yielded one at a time. Malformed input raises
+    ``json.JSONDecodeError`` with its line in the whole stream as soon as that line is read.
+    """
+    buffer = ""
+    eof = False
+    in_array = False
+    started = False
+    # Newlines in the text already consumed, so errors report lines of the whole input
+    lines_before = 0
+
+    def consume(count):
+        nonlocal buffer, lines_before
+        lines_before += buffer.count("\n", 0, count)
+        buffer = buffer[count:]
+
+    def fill():
+        nonlocal buffer, eof
+        chunk = stream.read(chunk_size)
+        if chunk:
+            buffer += chunk
+        else:
+            eof = True
+
+    while True:
+        # Skip whitespace (and commas between array elements)
+        stripped = buffer.lstrip(" \t\r\n,\ufeff" if in_array else " \t\r\n\ufeff")
+        consume(len(buffer) - len(stripped))
+        if not buffer:
+            if eof:
+                return
+            fill()
+            continue
+        if not started:
+            started = True
+            if buffer[0] == "[":
+                in_array = True
+                consume(1)
+                continue
+        if in_array and buffer[0] == "]":
+            consume(1)
+            in_array = False
+            continue
+        try:
+            value, end = _decoder.raw_decode(buffer)
+        except json.JSONDecodeError as exc:
+            # No JSON token spans a newline, so once the offending token's line is complete
+            # more input can't fix it; only an error at the very end of the buffer may
+            if eof or "\n" in buffer[exc.pos:]:
+                raise _at_input_line(exc, lines_before) from None
+            fill()
+            continue
+        if end == len(buffer) and not eof and isinstance(value, (int, float)):
+            # A number at the end of the buffer may continue in the next chunk
+            fill()
+            continue
+        consume(end)
+        yield value
+
+
+def _at_input_line(exc, lines_before):
+    error = json.JSONDecodeError(exc.msg, exc.doc, exc.pos)
+    error.lineno += lines_before
+    error.args = (f"{exc.msg}: line {error.lineno} column {error.colno}",)
+    return error
+
+
+def _safe_title(title):
+    return re.sub(r"[\\/:\0]+", "_", str(title)).strip() or "quote"
+
+
+def _invalid(index, message):
+    # Rendered as a manifest error line so one bad record doesn't stop a bulk run
+    return {"quote": None, "byline": None, "title": f"record_{index}", "style": None,
+            "error": f"Record {index}: {message}"}
+
+
+def _expand(value, index, defaults):
+    """Turn one input value into zero or more render records (or one error record)."""
+    if isinstance(value, str):
+        yield {**defaults, "quote": value, "title": f"quote_{index}"}
+        return
+    if not isinstance(value, dict):
+        yield _invalid(index, f"expected an object or string, got {type(value).__name__}")
+        return
+
+    byline = value.get("byline") or value.get("author") or defaults["byline"]
+    style = value.get("style") or defaults["style"]
+    if "quote" in value:
+        title = value.get("title") or f"quote_{index}"
+        yield {"quote": value["quote"], "byline": byline, "title": title, "style": style}
+        return
+
+    quotes = value.get("quotes")
+    if isinstance(quotes, dict):
+        # Serialised schemas.Quotes, e.g. a saved graph result
+        quotes = quotes.get("quotes")
+    if not isinstance(quotes, list):
+        yield _invalid(index, "needs a 'quote' or a 'quotes' list")
+        return
+    title = value.get("article_title") or value.get("title") or f"article_{index}"
+    for idx, quote in enumerate(quotes, start=1):
+        yield {"quote": quote, "byline": byline, "title": f"{title}_{idx}", "style": style}
+
+
+def iter_records(stream, byline=None, style="Original"):
+    """
+    Yield render records (``quote``, ``byline``, ``title``, ``style``) from a JSON/JSONL stream.
+
+    Each value may be a quote string, ``{"quote", "byline", "title", "style"}``, or an article
+    with a ``quotes`` list (and optional ``article_title``/``byline``), which expands to one
+    record per quote titled ``{article_title}_{n}`` like the CLI's output. Values that are
+    not records yield one record with an ``error`` instead, titled ``record_{n}``.
+    """
+    defaults = {"byline": byline or DEFAULT_BYLINE, "style": style}
+    for index, value in enumerate(_iter_json_values(stream), start=1):
+        for record in _expand(value, index, defaults):
+            # Titles become file names, so they can't contain path separators
+            record["title"] = _safe_title(record["title"])
+            yield record
+
+
+def _render_one(record, output_dir, force=False):
+    from .pipeline import format_byline
+    from .render_cache import render_if_changed
+
+    return render_if_changed(record["quote"], format_byline(record["byline"]), record["title"],
+                             save_dir=output_dir, style=record["style"], force=force)
+
+
+def render_records(records, output_dir, manifest_path=None, workers=1, force=False):
+    """
+    Render every record into ``output_dir`` and append one JSON line per slide to the manifest.
+
+    Records are consumed lazily and at most ``2 * workers`` renders are in flight, so memory
+    stays flat however long the input is. Slides whose inputs match the existing file are
+    skipped unless ``force`` is set. Invalid records and failed renders get an ``error`` line
+    and the run continues. If reading ``records`` raises, renders already started are still
+    finished and written before the error propagates. Returns ``(rendered, unchanged, failed)``.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(output_dir, "manifest.jsonl")
+    rendered = unchanged = failed = 0
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    pending = deque()
+
+    def finish(record, outcome):
+        nonlocal rendered, unchanged, failed
+        entry = {k: record[k] for k in ("title", "quote", "byline", "style")}
+        try:
+            if "error" in record:
+                raise ValueError(record["error"])
+            path, was_rendered = outcome()
+            entry["path"] = os.path.abspath(path)
+            entry["status"] = "rendered" if was_rendered else "unchanged"
+            if was_rendered:
+                rendered += 1
+            else:
+                unchanged += 1
+        except Exception as exc:  # noqa: BLE001 - recorded in the manifest, keep going
+            entry["status"] = "error"
+            entry["error"] = str(exc)
+            failed += 1
+        manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    try:
+        with open(manifest_path, "w", encoding="utf-8") as manifest:
+            try:
+                for record in records:
+                    if executor is None:
+                        finish(record, lambda r=record: _render_one(r, output_dir, force))
+                        continue
+                    # Error records queue up too, so the manifest keeps input order
+                    future = None if "error" in record else executor.submit(_render_one, record, output_dir, force)
+                    pending.append((record, future))
+                    if len(pending) >= 2 * workers:
+                        done_record, future = pending.popleft()
+                        finish(done_record, future and future.result)
+            finally:
+                # Also on a malformed stream: slides already submitted are written to the manifest
+                while pending:
+                    done_record, future = pending.popleft()
+                    finish(done_record, future and future.result)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return rendered, unchanged, failed
@@ -0,0 +1,90 @@
+import os
+import json
+import hashlib
+import inspect
+from functools import lru_cache
+
+# PNG tEXt chunk holding the hash of everything that went into a slide
+RENDER_KEY_CHUNK = "ai-post-render-key"
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files each style reads while drawing, resolved the same way the renderers resolve them.
+# Missing fonts change the output (the renderers fall back to a default font), so presence counts too.
+_STYLE_ASSETS = {
+    "Original": [
+        "DejaVuSerif.ttf",
+        os.path.join(_PROJECT_ROOT, "sundial_logo_white.png"),
+    ],
+    "The Free Press": [
+        "/System/Library/Fonts/Helvetica.ttc",
+        "/System/Library/Fonts/Arial.ttf",
+        os.path.expanduser("~/Library/Fonts/EBGaramond12-Regular.otf"),
+        os.path.expanduser("~/Library/Fonts/EBGaramond12-Italic.otf"),
+        "/System/Library/Fonts/Palatino.ttc",
+        "/System/Library/Fonts/Times.ttc",
+    ],
+}
+
+
+@lru_cache(maxsize=None)
+def style_fingerprint(style):
+    """
+    Hash of the renderer's source and the assets it uses, so editing a style
+    (layout, colors, size, fonts or logo) invalidates every slide drawn with it.
+    """
+    from .pipeline import get_renderer
+
+    digest = hashlib.sha256()
+    with open(inspect.getsourcefile(get_renderer(style)), "rb") as f:
+        digest.update(f.read())
+    for path in _STYLE_ASSETS.get(style, _STYLE_ASSETS["Original"]):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        except OSError:
+            digest.update(f"{path}:missing".encode())
+    return digest.hexdigest()
+
+
+def render_key(quote, byline, style, **options):
+    """Content hash of a slide's render inputs. ``options`` left as None don't affect the key."""
+    inputs = [quote, byline, style, style_fingerprint(style)]
+    options = {k: v for k, v in options.items() if v is not None}
+    if options:
+        inputs.append(options)
+    payload = json.dumps(inputs, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def read_render_key(path):
+    """The render key embedded in an existing PNG, or None if it has none or can't be read."""
+    from PIL import Image
+
+    try:
+        # Text chunks written before the image data are parsed on open, without decoding pixels
+        with Image.open(path) as image:
+            return image.info.get(RENDER_KEY_CHUNK)
+    except (OSError, ValueError):
+        return None
+
+
+def render_if_changed(quote, byline, title, save_dir=None, style="Original", force=False, **options):
+    """
+    Render a slide unless ``{save_dir}/{title}.png`` already holds the same inputs.
+    ``options`` (e.g. ``font_size``) are passed to the renderer and included in the key.
+    Returns ``(path, rendered)`` where ``rendered`` is False when the file was left untouched.
+    """
+    from PIL.PngImagePlugin import PngInfo
+    from .pipeline import get_renderer
+
+    key = render_key(quote, byline, style, **options)
+    output_path = os.path.join(save_dir, title + ".png") if save_dir else (title + ".png")
+    if not force and os.path.isfile(output_path) and read_render_key(output_path) == key:
+        return output_path, False
+
+    pnginfo = PngInfo()
+    pnginfo.add_text(RENDER_KEY_CHUNK, key)
+    options = {k: v for k, v in options.items() if v is not None}
+    path = get_renderer(style)(quote, byline, title, save_dir=save_dir, pnginfo=pnginfo, **options)
+    return path, True
@@ -0,0 +1,82 @@
+"""
+Sample article PDFs for tests, benchmarks and offline development, to pair with the fake
+LLM server (``src.fake_llm``): the text extracts cleanly with pdfplumber, and no fonts or
+PDF libraries are needed to write them.
+"""
+
+import os
+import random
+
+SENTENCES = [
+    "Universities exist to test ideas against their strongest objections.",
+    "Several students described staying silent in seminars rather than risk a reputation.",
+    "Faculty members disagreed about whether the problem was new or merely more visible.",
+    "A department chair argued that disagreement is a skill that has to be practiced.",
+    "The survey results suggest that self-censorship crosses political lines.",
+    "Critics of the proposal worry that viewpoint diversity could become a quota.",
+    "Supporters reply that a campus should be the easiest place to be wrong in public.",
+    "The debate society reported record attendance after changing its format.",
+    "Several alumni wrote in to say the same tensions existed decades ago.",
+    "Administrators have promised a review of how controversial speakers are invited.",
+]
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text, width=90):
+    lines, line = [], ""
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    return lines + ([line] if line else [])
+
+
+def write_sample_pdf(path, title, paragraphs, lines_per_page=48):
+    """Write a minimal text PDF (Helvetica, letter size) that pdfplumber can extract."""
+    lines = [title, ""]
+    for paragraph in paragraphs:
+        lines += _wrap(paragraph) + [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = {3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for index, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * index, 5 + 2 * index
+        body = "BT /F1 11 Tf 14 TL 72 740 Td " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in page_lines) + " ET"
+        stream = body.encode("latin-1", "replace")
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(f"{page_id} 0 R")
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (obj_id, objects[obj_id])
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offsets[obj_id] for obj_id in sorted(objects))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+def make_pdf_pool(directory, count, paragraphs=12, seed=0):
+    """Write ``count`` distinct sample articles of ``paragraphs`` paragraphs each."""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        body = [" ".join(rng.choice(SENTENCES) for _ in range(rng.randint(4, 8))) for _ in range(paragraphs)]
+        path = os.path.join(directory, f"Sample Article {index + 1}.pdf")
+        paths.append(write_sample_pdf(path, f"Sample Article {index + 1}", body))
+    return paths
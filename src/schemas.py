@@ -4,6 +4,10 @@ from typing import TypedDict, List
 class Quotes(BaseModel):
     quotes: List[str]
 
+class PostBundle(Quotes):
+    summary: str
+    insta_caption: str
+
 class State(TypedDict):
     article: str
     summary: str
@@ -0,0 +1,138 @@
+import time
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# OpenAI prompt caching: prompts of at least 1024 tokens can reuse a previously seen
+# exact prefix, in 128-token steps, for roughly 5-10 minutes of inactivity.
+CACHE_MIN_TOKENS = 1024
+CACHE_INCREMENT = 128
+CACHE_TTL_SECONDS = 600
+# Per-message formatting overhead in the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        name = tiktoken.encoding_name_for_model(model)
+    except KeyError:
+        name = "o200k_base"
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # Encoding files can't be downloaded (e.g. offline); fall back to an estimate
+        logger.warning("tiktoken encoding for %s unavailable; estimating tokens from length", model)
+        return None
+
+
+def count_tokens(text, model="gpt-4o"):
+    encoding = _encoding(model)
+    if encoding is None:
+        return max(1, len(text) // 4) if text else 0
+    return len(encoding.encode(text))
+
+
+def _message_role(message):
+    return getattr(message, "type", type(message).__name__)
+
+
+def message_token_counts(messages, model="gpt-4o"):
+    return [count_tokens(m.content, model) + MESSAGE_OVERHEAD_TOKENS for m in messages]
+
+
+def _prefix_keys(messages):
+    # Hash of each cumulative message prefix, so equal keys mean an identical prefix
+    digest = hashlib.sha1()
+    keys = []
+    for m in messages:
+        digest.update(_message_role(m).encode())
+        digest.update(b"\0")
+        digest.update(m.content.encode())
+        digest.update(b"\0")
+        keys.append(digest.hexdigest())
+    return keys
+
+
+def article_key(article):
+    return hashlib.sha1((article or "").encode()).hexdigest()[:10]
+
+
+class TokenLedger:
+    """
+    Counts input/output tokens per LLM call and estimates how many input tokens a
+    provider-side prompt cache could serve, by remembering the message prefixes already
+    sent to each model. Provider-reported cache hits are recorded alongside when available.
+    """
+
+    def __init__(self, ttl_seconds=CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._seen = {}
+        self._articles = {}
+
+    def record(self, node, model, messages, usage=None, article=None, now=None):
+        now = now if now is not None else time.time()
+        counts = message_token_counts(messages, model)
+        keys = _prefix_keys(messages)
+        input_tokens = sum(counts)
+
+        with self._lock:
+            seen = self._seen.setdefault(model, {})
+            for key in [k for k, last in seen.items() if now - last > self.ttl_seconds]:
+                del seen[key]
+            matched = 0
+            for key, tokens in zip(keys, counts):
+                if key not in seen:
+                    break
+                matched += tokens
+            for key in keys:
+                seen[key] = now
+
+            cacheable = 0
+            if input_tokens >= CACHE_MIN_TOKENS and matched >= CACHE_MIN_TOKENS:
+                cacheable = matched - matched % CACHE_INCREMENT
+
+            usage = usage or {}
+            entry = {
+                "node": node,
+                "model": model,
+                "input_tokens": input_tokens,
+                "cacheable_tokens": cacheable,
+                "uncached_tokens": input_tokens - cacheable,
+                "output_tokens": usage.get("output_tokens"),
+                "provider_input_tokens": usage.get("input_tokens"),
+                "provider_cached_tokens": (usage.get("input_token_details") or {}).get("cache_read"),
+            }
+            if article is not None:
+                totals = self._articles.setdefault(article_key(article), {
+                    "calls": 0, "input_tokens": 0, "cacheable_tokens": 0, "uncached_tokens": 0,
+                    "output_tokens": 0, "provider_cached_tokens": 0,
+                })
+                totals["calls"] += 1
+                for field in ("input_tokens", "cacheable_tokens", "uncached_tokens",
+                              "output_tokens", "provider_cached_tokens"):
+                    totals[field] += entry[field] or 0
+
+        logger.info(
+            "%s [%s]: %d input tokens (%d cacheable prefix, %d uncached), provider cached=%s, output=%s",
+            node, model, input_tokens, cacheable, input_tokens - cacheable,
+            entry["provider_cached_tokens"], entry["output_tokens"],
+        )
+        return entry
+
+    def pop_article_totals(self, article):
+        """Return (and forget) the per-article totals once that article's run has finished."""
+        with self._lock:
+            return self._articles.pop(article_key(article), {})
+
+
+# Process-wide ledger: the provider's cache is shared by every call from this deployment
+ledger = TokenLedger()
@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import signal
+import socket
+import logging
+import argparse
+import threading
+import subprocess
+from .job_queue import JobQueue, DEFAULT_LEASE_SECONDS
+from .llm_scheduler import LLMRateLimitError
+
+logger = logging.getLogger(__name__)
+
+# Seconds a stopping pool waits for running jobs before killing their workers; long enough for
+# a typical article, so a normal shutdown doesn't interrupt one
+DEFAULT_STOP_TIMEOUT = 180
+
+
+def handle_generate(payload, progress):
+    """Default job handler: run the article → quotes → images pipeline."""
+    from .pipeline import generate_posts
+
+    return generate_posts(
+        payload["article_path"],
+        author=payload.get("author", ""),
+        style=payload.get("style", "Original"),
+        save_dir=payload.get("save_dir"),
+        article_title=payload.get("article_title"),
+        progress=progress,
+        mode=payload.get("mode", "standard"),
+        carousel=payload.get("carousel", False),
+    )
+
+
+HANDLERS = {"generate": handle_generate}
+
+
+class _Heartbeat(threading.Thread):
+    """Keeps a claimed job's lease alive while its handler runs."""
+
+    def __init__(self, queue, job_id, worker_id, lease_seconds):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.lease_seconds / 3):
+            try:
+                self.queue.heartbeat(self.job_id, self.worker_id, self.lease_seconds)
+            except Exception:
+                logger.exception("Heartbeat failed for job %s", self.job_id)
+
+    def stop(self):
+        self.stopped.set()
+
+
+def run_worker(db_path=None, worker_id=None, poll_interval=0.5, lease_seconds=DEFAULT_LEASE_SECONDS,
+               handlers=None, stop_event=None, max_jobs=None):
+    """
+    Claim and run jobs until ``stop_event`` is set (or ``max_jobs`` have been handled).
+    Returns the number of jobs processed.
+    """
+    logging.getLogger("pdfminer").setLevel(logging.ERROR)
+    queue = JobQueue(db_path)
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    handlers = handlers or HANDLERS
+    processed = 0
+    while not (stop_event and stop_event.is_set()):
+        if max_jobs is not None and processed >= max_jobs:
+            break
+        job = queue.claim(worker_id, lease_seconds)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        heartbeat = _Heartbeat(queue, job["id"], worker_id, lease_seconds)
+        heartbeat.start()
+
+        def progress(message, job_id=job["id"]):
+            queue.heartbeat(job_id, worker_id, lease_seconds, progress=message)
+
+        try:
+            handler = handlers.get(job["kind"])
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            result = handler(job["payload"], progress)
+        except Exception as exc:  # noqa: BLE001 - recorded on the job for the caller to surface
+            logger.exception("Job %s failed", job["id"])
+            # Rate limits outlasting the scheduler's retries are usually gone by the next attempt
+            queue.fail(job["id"], worker_id, exc, retry=isinstance(exc, LLMRateLimitError))
+        else:
+            queue.complete(job["id"], worker_id, result)
+        finally:
+            heartbeat.stop()
+        processed += 1
+    return processed
+
+
+class WorkerPool:
+    """
+    Runs ``concurrency`` worker processes against one queue database and restarts
+    any that exit unexpectedly. Jobs they were holding are recovered once their lease expires.
+
+    Each worker is a fresh ``python -m src.worker`` process rather than a multiprocessing
+    child, so it never re-imports the parent's entry point (e.g. Gradio for the UI) and
+    only loads the LLM and rendering stack when it picks up its first job.
+    """
+
+    def __init__(self, concurrency=1, db_path=None, lease_seconds=DEFAULT_LEASE_SECONDS, poll_interval=0.5):
+        self.concurrency = concurrency
+        self.db_path = JobQueue(db_path).db_path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._stopping = threading.Event()
+        self._processes = [None] * concurrency
+        self._supervisor = None
+
+    def _spawn(self, slot):
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self._processes[slot] = subprocess.Popen(
+            [
+                sys.executable, "-m", "src.worker",
+                "--concurrency", "1",
+                "--db", self.db_path,
+                "--lease", str(self.lease_seconds),
+                "--poll", str(self.poll_interval),
+            ],
+            cwd=project_root,
+        )
+
+    def _supervise(self):
+        while not self._stopping.wait(1.0):
+            for slot, process in enumerate(self._processes):
+                if process is not None and process.poll() is not None:
+                    logger.warning("Worker %s exited with code %s; restarting", slot, process.returncode)
+                    self._spawn(slot)
+
+    def start(self):
+        for slot in range(self.concurrency):
+            self._spawn(slot)
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Ask every worker to exit after its current job and wait up to ``timeout`` seconds
+        (default ``$WORKER_STOP_TIMEOUT`` or 180). Workers still busy after that are killed;
+        their jobs stay claimed until the lease expires and then run again from the start.
+        """
+        if timeout is None:
+            timeout = float(os.getenv("WORKER_STOP_TIMEOUT", DEFAULT_STOP_TIMEOUT))
+        self._stopping.set()
+        # SIGTERM stops a worker from claiming new jobs; the one it is running carries on
+        for process in self._processes:
+            if process is not None and process.poll() is None:
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self._processes:
+            if process is None:
+                continue
+            try:
+                process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning("Worker %s still busy after %.0fs; killing it", process.pid, timeout)
+                process.kill()
+                process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run post-generation workers against the job queue.")
+    parser.add_argument("--concurrency", "-c", type=int, default=int(os.getenv("WORKER_CONCURRENCY", 1)),
+                        help="Number of worker processes")
+    parser.add_argument("--db", help="Path to the queue database (defaults to $JOB_DB_PATH)", default=None)
+    parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="Seconds a job stays claimed without a heartbeat")
+    parser.add_argument("--poll", type=float, default=0.5, help="Seconds between queue polls when idle")
+    args = parser.parse_args()
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
+    # SIGINT/SIGTERM stop taking new jobs; a job already running is allowed to finish
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+
+    if args.concurrency > 1:
+        pool = WorkerPool(concurrency=args.concurrency, db_path=args.db, lease_seconds=args.lease,
+                          poll_interval=args.poll).start()
+        stop_event.wait()
+        pool.stop()
+    else:
+        run_worker(db_path=args.db, poll_interval=args.poll, lease_seconds=args.lease, stop_event=stop_event)
+
+if __name__ == "__main__":
+    main()
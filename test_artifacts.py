@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-session artifact store and zip bundling.
+"""
+
+import io
+import os
+import time
+import zipfile
+
+from src.artifacts import ArtifactStore, build_zip
+
+
+def _write(path, size):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+def test_sessions_are_isolated(tmp_path):
+    """Each session, and each run within it, gets its own directory."""
+    store = ArtifactStore(root=str(tmp_path), max_bytes=10**9, max_age_seconds=3600)
+    a = store.new_job_dir("session-a")
+    b = store.new_job_dir("session-b")
+    assert os.path.dirname(a) != os.path.dirname(b)
+    assert store.new_job_dir("session-a") != a
+    assert store.owns(a)
+    # Session ids can't escape the store
+    assert store.owns(store.session_dir("../../etc"))
+
+
+def _age(path, seconds):
+    past = time.time() - seconds
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (past, past))
+        os.utime(dirpath, (past, past))
+
+
+def test_evicts_idle_runs(tmp_path):
+    """Runs idle past max age are removed unless a job still uses them."""
+    store = ArtifactStore(root=str(tmp_path), max_bytes=10**9, max_age_seconds=60)
+    old = store.new_job_dir("old")
+    _write(os.path.join(old, "a.png"), 10)
+    active = store.new_job_dir("busy")
+    _write(os.path.join(active, "article.pdf"), 10)
+
+    future = time.time() + 120
+    removed = store.evict(keep=[os.path.join(active, "article.pdf")], now=future)
+    assert removed == [os.path.join("old", os.path.basename(old))]
+    assert os.path.isdir(active)
+
+
+def test_evicts_least_recently_used_runs_over_budget(tmp_path):
+    """Over the size budget the oldest runs go first, including the caller's own, but never active ones."""
+    store = ArtifactStore(root=str(tmp_path), max_bytes=250, max_age_seconds=3600)
+    runs = []
+    for age in (300, 200, 100):
+        run = store.new_job_dir("same-session")
+        _write(os.path.join(run, "a.png"), 100)
+        _age(run, age)
+        runs.append(run)
+    queued = store.new_job_dir("other")
+    _write(os.path.join(queued, "a.png"), 100)
+    _age(queued, 400)
+
+    removed = store.evict(keep=[queued])
+    assert removed == [os.path.join("same-session", os.path.basename(runs[0])),
+                       os.path.join("same-session", os.path.basename(runs[1]))]
+    assert os.path.isdir(queued) and os.path.isdir(runs[2])
+
+
+def test_fresh_runs_are_not_evicted(tmp_path):
+    """A run just created by the UI survives even before its job is queued."""
+    store = ArtifactStore(root=str(tmp_path), max_bytes=0, max_age_seconds=3600)
+    run = store.new_job_dir("s")
+    _write(os.path.join(run, "article.pdf"), 10)
+    assert store.evict() == []
+
+
+def test_closing_a_session_keeps_active_runs(tmp_path):
+    store = ArtifactStore(root=str(tmp_path), max_bytes=10**9, max_age_seconds=3600)
+    done = store.new_job_dir("s")
+    running = store.new_job_dir("s")
+    store.remove_session("s", keep=[running])
+    assert not os.path.exists(done)
+    assert os.path.isdir(running)
+
+
+def test_build_zip_stores_images(tmp_path):
+    """PNGs are stored uncompressed; text is deflated. Works with in-memory buffers."""
+    png = _write(os.path.join(tmp_path, "slide_1.png"), 200)
+    txt = _write(os.path.join(tmp_path, "caption.txt"), 200)
+    buffer = build_zip([png, txt], io.BytesIO())
+    with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as zf:
+        info = {i.filename: i.compress_type for i in zf.infolist()}
+    assert info == {"slide_1.png": zipfile.ZIP_STORED, "caption.txt": zipfile.ZIP_DEFLATED}
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for rendering a carousel as one ordered bundle.
+"""
+
+import json
+import zipfile
+
+from src.carousel import CLOSING_TEXT, plan_carousel, render_carousel
+
+QUOTES = [
+    "Short and sharp.",
+    "The most profound insights often come from the deliberate contemplation of ideas that "
+    "challenge our assumptions, and from the patience to follow them wherever they lead. " * 3,
+]
+
+
+def test_plan_shares_one_font_size():
+    """Every quote slide uses the size that fits the longest quote; cover and closing share theirs."""
+    slides = plan_carousel("Article", QUOTES)
+    assert [s["kind"] for s in slides] == ["cover", "quote", "quote", "closing"]
+    assert slides[0]["text"] == "Article" and slides[-1]["text"] == CLOSING_TEXT
+    assert slides[1]["font_size"] == slides[2]["font_size"]
+    assert slides[0]["font_size"] == slides[-1]["font_size"]
+    # The long quote forces a smaller size than the short one would get on its own
+    assert slides[1]["font_size"] < plan_carousel("Article", QUOTES[:1])[1]["font_size"]
+
+
+def test_bundle_is_ordered_and_re_render_is_skipped(tmp_path):
+    """The zip lists slides in posting order, and unchanged slides aren't redrawn."""
+    bundle = render_carousel("Article", QUOTES, caption="Caption #tag", save_dir=str(tmp_path), workers=2)
+    assert all(slide["rendered"] for slide in bundle["slides"])
+    with zipfile.ZipFile(bundle["bundle_path"]) as zf:
+        names = zf.namelist()
+    assert names[:4] == [f"Article_carousel_0{i}_{kind}.png"
+                         for i, kind in enumerate(["cover", "quote", "quote", "closing"])]
+    with open(bundle["manifest_path"], encoding="utf-8") as f:
+        assert json.load(f)["caption"] == "Caption #tag"
+
+    again = render_carousel("Article", QUOTES, caption="Caption #tag", save_dir=str(tmp_path), workers=1)
+    assert not any(slide["rendered"] for slide in again["slides"])
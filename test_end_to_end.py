@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Runs the whole pipeline (PDF → LLM graph → slides) against the local fake OpenAI server.
+See benchmarks/load_test.py for the concurrent version.
+"""
+
+import os
+
+import pytest
+
+from src.fake_llm import CANNED_CAPTION, CANNED_QUOTES
+from src.pipeline import extract_article_text, generate_posts
+from src.sample_articles import make_pdf_pool, write_sample_pdf
+
+
+def test_sample_pdfs_are_extractable(tmp_path):
+    path = write_sample_pdf(str(tmp_path / "a.pdf"), "Title (draft)", ["First paragraph. " * 40] * 6)
+    text = extract_article_text(path)
+    assert text.startswith("Title (draft)")
+    assert text.count("paragraph.") == 240
+
+
+@pytest.mark.parametrize("mode", ["standard", "single_call"])
+def test_generate_posts_end_to_end(tmp_path, fake_openai, mode):
+    """Every graph mode turns a PDF into one slide per quote plus a caption file."""
+    server = fake_openai(rate_limit_first=1, retry_after=0.01)
+    pdf = make_pdf_pool(str(tmp_path), 1)[0]
+    result = generate_posts(pdf, author="Jane Doe", save_dir=str(tmp_path), mode=mode)
+    assert result["quotes"] == CANNED_QUOTES
+    assert result["caption"] == CANNED_CAPTION
+    assert len(result["image_paths"]) == len(CANNED_QUOTES)
+    assert all(os.path.isfile(p) for p in result["image_paths"])
+    assert set(result["timings"]) == {"extract", "graph", "render"}
+    assert server.rate_limited == 1
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite job queue and worker loop used by the Gradio app.
+"""
+
+import os
+import time
+import sqlite3
+
+from src.job_queue import JobQueue, QUEUED, RUNNING, DONE, FAILED, RETRY_BASE_DELAY
+from src.worker import run_worker
+
+
+def _queue(tmp_path):
+    return JobQueue(os.path.join(tmp_path, "jobs.sqlite3"))
+
+
+def test_enqueue_claim_complete(tmp_path):
+    """A job moves queued → running → done and keeps its payload and result."""
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue({"article_path": "a.pdf"})
+    assert queue.get(job_id)["status"] == QUEUED
+
+    job = queue.claim("w1")
+    assert job["id"] == job_id
+    assert job["status"] == RUNNING
+    assert job["attempts"] == 1
+    assert queue.claim("w2") is None
+
+    assert queue.complete(job_id, "w1", {"image_paths": ["a_1.png"]})
+    done = queue.get(job_id)
+    assert done["status"] == DONE
+    assert done["result"] == {"image_paths": ["a_1.png"]}
+
+
+def test_jobs_are_claimed_in_order(tmp_path):
+    """Older jobs are handed out first and report their queue position."""
+    queue = _queue(tmp_path)
+    first = queue.enqueue({"n": 1})
+    second = queue.enqueue({"n": 2})
+    assert queue.position(first) == 0
+    assert queue.position(second) == 1
+    assert queue.claim("w1")["id"] == first
+    assert queue.claim("w1")["id"] == second
+
+
+def test_expired_lease_is_recovered(tmp_path):
+    """A job held by a worker that stopped heartbeating is handed to another worker."""
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue({"n": 1}, max_attempts=2)
+    queue.claim("crashed", lease_seconds=0.01)
+    time.sleep(0.05)
+
+    job = queue.claim("w2")
+    assert job["id"] == job_id
+    assert job["attempts"] == 2
+    # The crashed worker can no longer report on the job
+    assert not queue.complete(job_id, "crashed", {})
+
+    queue.heartbeat(job_id, "w2", lease_seconds=0.01)
+    time.sleep(0.05)
+    assert queue.claim("w3") is None
+    failed = queue.get(job_id)
+    assert failed["status"] == FAILED
+
+
+def test_retried_job_waits_out_its_backoff(tmp_path):
+    """A requeued job is not claimed again until its retry delay has passed."""
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue({"n": 1})
+    queue.claim("w1")
+    queue.fail(job_id, "w1", "rate limited", retry=True)
+    job = queue.get(job_id)
+    assert job["status"] == QUEUED
+    assert job["available_at"] - job["updated_at"] >= RETRY_BASE_DELAY / 2
+    assert queue.claim("w2") is None
+
+    job_id = queue.enqueue({"n": 2})
+    queue.claim("w1")
+    queue.fail(job_id, "w1", "rate limited", retry=True, delay=0.05)
+    assert queue.claim("w2") is None
+    time.sleep(0.1)
+    assert queue.claim("w2")["id"] == job_id
+
+
+def test_queue_adds_retry_column_to_old_databases(tmp_path):
+    path = os.path.join(tmp_path, "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+                 "payload TEXT NOT NULL, result TEXT, error TEXT, progress TEXT, attempts INTEGER NOT NULL DEFAULT 0, "
+                 "max_attempts INTEGER NOT NULL, worker_id TEXT, lease_expires REAL, created_at REAL NOT NULL, "
+                 "updated_at REAL NOT NULL)")
+    conn.close()
+    queue = JobQueue(path)
+    job_id = queue.enqueue({"n": 1})
+    assert queue.claim("w1")["id"] == job_id
+
+
+def test_worker_runs_handler_and_records_errors(tmp_path):
+    """The worker loop stores handler results and surfaces exceptions as failures."""
+    queue = _queue(tmp_path)
+    ok_id = queue.enqueue({"value": 2}, kind="double")
+    bad_id = queue.enqueue({"value": 0}, kind="explode")
+
+    def double(payload, progress):
+        progress("Doubling...")
+        return {"value": payload["value"] * 2}
+
+    def explode(payload, progress):
+        raise ValueError("boom")
+
+    processed = run_worker(
+        db_path=queue.db_path,
+        worker_id="w1",
+        poll_interval=0.01,
+        handlers={"double": double, "explode": explode},
+        max_jobs=2,
+    )
+    assert processed == 2
+    assert queue.get(ok_id)["result"] == {"value": 4}
+    failed = queue.get(bad_id)
+    assert failed["status"] == FAILED
+    assert "boom" in failed["error"]
+
+
+def test_watch_yields_until_terminal(tmp_path):
+    """watch() stops once the job has finished."""
+    queue = _queue(tmp_path)
+    job_id = queue.enqueue({})
+    queue.claim("w1")
+    queue.complete(job_id, "w1", {"ok": True})
+    statuses = [job["status"] for job in queue.watch(job_id, poll_interval=0.01)]
+    assert statuses == [DONE]
+
+
+def test_cancel_only_affects_queued_jobs(tmp_path):
+    queue = _queue(tmp_path)
+    running = queue.enqueue({})
+    queue.claim("w1")
+    waiting = queue.enqueue({})
+    assert queue.cancel(waiting)
+    assert queue.get(waiting)["status"] == FAILED
+    assert not queue.cancel(running)
+    assert queue.get(running)["status"] == RUNNING
+
+
+def test_ui_gives_up_when_no_worker_runs(tmp_path, monkeypatch):
+    """Without a worker the handler reports an error instead of waiting forever."""
+    from src import gui
+    from src.artifacts import ArtifactStore
+
+    monkeypatch.setattr(gui, "_job_queue", _queue(tmp_path))
+    monkeypatch.setattr(gui, "_artifact_store", ArtifactStore(os.path.join(tmp_path, "artifacts")))
+    monkeypatch.setenv("JOB_TIMEOUT_SECONDS", "0.2")
+    article = os.path.join(tmp_path, "a.pdf")
+    with open(article, "wb") as f:
+        f.write(b"%PDF-1.4")
+    status = list(gui.run_generation(article, "Jane Doe"))[-1][3]["value"]
+    assert status.startswith("Error: no worker picked up the job")
+    # The abandoned job is cancelled rather than left for a worker to run later
+    (job,) = gui._job_queue.jobs()
+    assert job["status"] == FAILED
+    assert gui._job_queue.claim("late-worker") is None
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the rate-limit-aware LLM scheduler, against the local fake OpenAI server.
+"""
+
+import threading
+
+import pytest
+
+from src import nodes
+from src.llm_scheduler import LLMRateLimitError, LLMScheduler, SharedSlots, SharedTokenBucket, TokenBucket, _SharedStore
+
+
+class FakeClock:
+    """Monotonic clock that only advances when something sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _use_scheduler(monkeypatch, **options):
+    scheduler = LLMScheduler(base_delay=0.01, **options)
+    monkeypatch.setattr(nodes, "scheduler", scheduler)
+    return scheduler
+
+
+def _summarize():
+    return nodes.summarizer({"article": "An article about campus debate. " * 20})["summary"]
+
+
+def test_token_bucket_waits_for_refill():
+    """Once the burst is spent, each request waits for its share of the per-minute rate."""
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock, sleep=clock.sleep)
+    assert sum(bucket.acquire() for _ in range(60)) == 0
+    assert bucket.acquire() == pytest.approx(1.0)
+    bucket.settle(-30)
+    assert bucket.acquire(30) == 0
+
+
+def test_shared_bucket_is_one_budget_across_processes(tmp_path):
+    """Two schedulers on the same database (e.g. two workers) draw from the same bucket."""
+    clock = FakeClock()
+    db_path = str(tmp_path / "limits.sqlite3")
+    first, second = (SharedTokenBucket(_SharedStore(db_path), "gpt-4o:requests", 60, clock=clock, sleep=clock.sleep)
+                     for _ in range(2))
+    assert sum(first.acquire() for _ in range(40)) == 0
+    assert sum(second.acquire() for _ in range(20)) == 0
+    assert second.acquire() == pytest.approx(1.0)
+    assert first.available == pytest.approx(0)
+
+
+def test_shared_slots_cap_concurrency_across_processes(tmp_path):
+    clock = FakeClock()
+    db_path = str(tmp_path / "limits.sqlite3")
+    first, second = (SharedSlots(_SharedStore(db_path), "gpt-4o", 2, lease=30, clock=clock, sleep=clock.sleep)
+                     for _ in range(2))
+    held = [first.acquire(), second.acquire()]
+    # Both slots are taken, so the next caller waits until a lease expires
+    second.acquire()
+    assert clock.now > 30
+    first.release(held[0])
+
+
+def test_request_budget_spaces_out_calls():
+    """With rpm=2 the third call waits half a minute for the bucket to refill."""
+    clock = FakeClock()
+    scheduler = LLMScheduler(rpm=2, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        scheduler.call("gpt-4o", lambda: "ok")
+    assert clock.now == pytest.approx(30.0)
+    assert scheduler.metrics()["gpt-4o"]["throttle_seconds"] == pytest.approx(30.0)
+
+
+def test_rate_limits_are_retried(monkeypatch, fake_openai):
+    """429s from the server are retried with backoff and the call succeeds."""
+    server = fake_openai(rate_limit_first=2)
+    scheduler = _use_scheduler(monkeypatch)
+    assert _summarize()
+    metrics = scheduler.metrics()["gpt-4o-mini"]
+    assert (metrics["retries"], metrics["rate_limited"], metrics["succeeded"]) == (2, 2, 1)
+    assert server.requests == 3
+
+
+def test_persistent_rate_limit_raises_clear_error(monkeypatch, fake_openai):
+    """After the last retry the caller gets an LLMRateLimitError, not a raw client error."""
+    fake_openai(rate_limit_rate=1.0)
+    scheduler = _use_scheduler(monkeypatch, max_retries=2)
+    with pytest.raises(LLMRateLimitError, match="rate limited after 3 attempts"):
+        _summarize()
+    assert scheduler.metrics()["gpt-4o-mini"]["failed"] == 1
+
+
+def test_other_errors_are_not_retried():
+    scheduler = LLMScheduler()
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        scheduler.call("gpt-4o", broken)
+    assert len(calls) == 1
+
+
+def test_concurrency_is_capped_per_model(monkeypatch, fake_openai):
+    """No more than max_concurrency requests for a model reach the server at once."""
+    server = fake_openai(latency=0.1)
+    _use_scheduler(monkeypatch, max_concurrency=2)
+    threads = [threading.Thread(target=_summarize) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.requests == 6
+    assert server.max_in_flight == 2
+
+
+def test_fake_server_answers_each_task(monkeypatch, fake_openai):
+    fake_openai()
+    _use_scheduler(monkeypatch)
+    assert _summarize().startswith("The article")
+    quotes = nodes.quote_generator({"article": "An article."})["quotes"]
+    assert len(quotes.quotes) == 3
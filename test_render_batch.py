@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming quote records into the batch renderer.
+"""
+
+import io
+import json
+import os
+
+import pytest
+
+from src.render_batch import _iter_json_values, iter_records, render_records
+
+
+def test_reads_jsonl_arrays_and_pretty_printed_values():
+    """JSONL, a top-level array and pretty-printed objects all stream the same values."""
+    values = [{"quote": "a"}, {"quote": "b", "title": "t"}, "c"]
+    jsonl = "\n".join(json.dumps(v) for v in values)
+    array = json.dumps(values, indent=2)
+    pretty = "\n".join(json.dumps(v, indent=2) for v in values)
+    for text in (jsonl, array, pretty):
+        # A tiny chunk size forces values to straddle read boundaries
+        assert list(_iter_json_values(io.StringIO(text), chunk_size=3)) == values
+
+
+def test_malformed_input_raises():
+    with pytest.raises(json.JSONDecodeError):
+        list(_iter_json_values(io.StringIO('{"quote": "a"}\n{"quote": ')))
+
+
+def test_malformed_line_is_reported_without_reading_on():
+    """A syntax error in JSONL raises at its line instead of buffering the rest of the input."""
+    class Endless(io.StringIO):
+        def read(self, size=-1):
+            chunk = super().read(size)
+            # Past the bad line, keep producing valid records forever
+            return chunk or '{"quote": "more"}\n' * 100
+
+    stream = Endless('{"quote": "a"}\n{"quote": "b"}\n{"quote": nope}\n')
+    values = []
+    with pytest.raises(json.JSONDecodeError) as error:
+        for value in _iter_json_values(stream, chunk_size=8):
+            values.append(value)
+    assert values == [{"quote": "a"}, {"quote": "b"}]
+    assert error.value.lineno == 3
+
+
+def test_article_records_expand_like_the_cli():
+    """A saved graph result expands to one slide per quote, titled {article}_{n}."""
+    stream = io.StringIO(json.dumps({
+        "article_title": "Issue 3",
+        "author": "Jane Doe",
+        "quotes": {"quotes": ["first", "second"]},
+    }))
+    records = list(iter_records(stream, style="The Free Press"))
+    assert [r["title"] for r in records] == ["Issue 3_1", "Issue 3_2"]
+    assert {r["byline"] for r in records} == {"Jane Doe"}
+    assert {r["style"] for r in records} == {"The Free Press"}
+
+
+def test_defaults_apply_to_bare_records():
+    records = list(iter_records(io.StringIO('"just a quote"\n{"quote": "x", "byline": "B"}'), byline="Default"))
+    assert records[0] == {"quote": "just a quote", "byline": "Default", "style": "Original", "title": "quote_1"}
+    assert records[1]["byline"] == "B"
+    assert records[1]["title"] == "quote_2"
+
+
+def test_render_records_writes_images_and_manifest(tmp_path):
+    """Every record produces an image and a manifest line, in input order."""
+    records = iter_records(io.StringIO(
+        '{"quote": "A short quote for testing.", "title": "one"}\n'
+        '{"quote": "Another short quote.", "title": "nested/two"}\n'
+    ))
+    assert render_records(records, str(tmp_path)) == (2, 0, 0)
+    with open(os.path.join(tmp_path, "manifest.jsonl"), encoding="utf-8") as f:
+        manifest = [json.loads(line) for line in f]
+    assert [m["title"] for m in manifest] == ["one", "nested_two"]
+    assert all(m["status"] == "rendered" and os.path.isfile(m["path"]) for m in manifest)
+    # Titles can't escape the output directory
+    assert os.path.dirname(manifest[1]["path"]) == str(tmp_path)
+
+
+def test_bad_records_are_logged_and_the_run_continues(tmp_path):
+    """Invalid records get an error line in input order; the records around them still render."""
+    records = iter_records(io.StringIO('{"quote": "First quote.", "title": "a"}\n42\n{"title": "no quote"}\n'
+                                       '{"quote": "Second quote.", "title": "b"}\n'))
+    assert render_records(records, str(tmp_path), workers=2) == (2, 0, 2)
+    with open(os.path.join(tmp_path, "manifest.jsonl"), encoding="utf-8") as f:
+        manifest = [json.loads(line) for line in f]
+    assert [(m["title"], m["status"]) for m in manifest] == [
+        ("a", "rendered"), ("record_2", "error"), ("record_3", "error"), ("b", "rendered")]
+    assert "got int" in manifest[1]["error"]
+
+
+def test_top_level_options_reach_the_render_subcommand():
+    """Options given before `render` are not reset by the subcommand's defaults."""
+    from src.main import build_parser
+
+    args = build_parser().parse_args(["--style", "The Free Press", "-o", "out", "-f", "render", "--quote", "x"])
+    assert (args.style, args.output, args.force) == ("The Free Press", "out", True)
+    args = build_parser().parse_args(["render", "--quote", "x", "--style", "The Free Press"])
+    assert (args.style, args.output, args.force) == ("The Free Press", None, False)
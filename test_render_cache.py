@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests for skipping slides whose render inputs have not changed.
+"""
+
+import io
+import os
+
+from src.render_cache import render_if_changed, read_render_key, render_key
+from src.render_batch import iter_records, render_records
+
+QUOTE = "The most profound insights often come from the deliberate contemplation of ideas."
+
+
+def test_unchanged_slide_is_not_rewritten(tmp_path):
+    """A second render with identical inputs leaves the file untouched."""
+    path, rendered = render_if_changed(QUOTE, "-Jane Doe", "slide", save_dir=str(tmp_path))
+    assert rendered
+    assert read_render_key(path) == render_key(QUOTE, "-Jane Doe", "Original")
+    mtime = os.stat(path).st_mtime_ns
+
+    again, rendered = render_if_changed(QUOTE, "-Jane Doe", "slide", save_dir=str(tmp_path))
+    assert again == path
+    assert not rendered
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_changed_inputs_or_force_re_render(tmp_path):
+    """Changing the quote, byline or style (or forcing) rewrites the slide."""
+    render_if_changed(QUOTE, "-Jane Doe", "slide", save_dir=str(tmp_path))
+    assert render_if_changed(QUOTE, "-John Roe", "slide", save_dir=str(tmp_path))[1]
+    assert render_if_changed(QUOTE, "-John Roe", "slide", save_dir=str(tmp_path), style="The Free Press")[1]
+    assert render_if_changed(QUOTE, "-John Roe", "slide", save_dir=str(tmp_path), style="The Free Press",
+                             force=True)[1]
+
+
+def test_files_without_a_key_are_re_rendered(tmp_path):
+    """Slides from before render keys existed (or foreign files) are replaced."""
+    path = os.path.join(tmp_path, "slide.png")
+    with open(path, "wb") as f:
+        f.write(b"not a png")
+    assert read_render_key(path) is None
+    assert render_if_changed(QUOTE, "-Jane Doe", "slide", save_dir=str(tmp_path))[1]
+
+
+def test_batch_re_render_is_a_no_op(tmp_path):
+    """Re-running a batch over the same records only reports unchanged slides."""
+    text = '{"quote": "First quote.", "title": "a"}\n{"quote": "Second quote.", "title": "b"}\n'
+    assert render_records(iter_records(io.StringIO(text)), str(tmp_path)) == (2, 0, 0)
+    assert render_records(iter_records(io.StringIO(text)), str(tmp_path)) == (0, 2, 0)
+    edited = text.replace("Second quote.", "Second quote, edited.")
+    assert render_records(iter_records(io.StringIO(edited)), str(tmp_path)) == (1, 1, 0)
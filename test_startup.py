@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Guards against heavy dependencies creeping back into module import time.
+See benchmarks/bench_startup.py for the timing budget.
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+LLM_AND_PDF = ["langchain_openai", "langgraph", "openai", "pdfplumber"]
+
+
+def _imported(code):
+    probe = code + "\nimport sys\nprint(' '.join(sorted(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=PROJECT_ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return set(out.split())
+
+
+@pytest.mark.parametrize("module", ["src.main", "src.pipeline", "src.worker", "src.gui"])
+def test_entry_points_do_not_import_llm_or_pdf_stack(module):
+    """Importing an entry point leaves the LLM and PDF stack unloaded."""
+    loaded = _imported(f"import {module}")
+    assert not [m for m in LLM_AND_PDF if m in loaded]
+
+
+def test_cli_and_worker_skip_gradio_and_pillow():
+    """The CLI and workers don't pay for the UI toolkit or the renderer until they need them."""
+    loaded = _imported("import src.main, src.worker")
+    assert "gradio" not in loaded
+    assert "PIL" not in loaded
+
+
+def test_render_subcommand_never_imports_llm_stack(tmp_path):
+    """`python -m src.main render` draws a slide without loading the LLM stack."""
+    code = (
+        "import sys, runpy\n"
+        f"sys.argv = ['src.main', 'render', '--quote', 'A test quote.', '--output', {str(tmp_path)!r}]\n"
+        "runpy.run_module('src.main', run_name='__main__')"
+    )
+    loaded = _imported(code)
+    assert os.path.isfile(os.path.join(tmp_path, "quote.png"))
+    assert not [m for m in LLM_AND_PDF if m in loaded]
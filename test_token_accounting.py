@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for per-call token accounting and the prompt-cache prefix estimate.
+"""
+
+import pytest
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from src import nodes
+from src.token_accounting import TokenLedger, CACHE_INCREMENT
+from src.prompts import sundial_sys_msg, pullout_sys_msg, summarizer_sys_msg, insta_caption_sys_msg
+
+ARTICLE = "Columbia students debated free speech on campus this week. " * 200
+OTHER_ARTICLE = "The dining halls will extend their hours during finals. " * 200
+
+
+@pytest.fixture
+def replay(monkeypatch, fake_openai):
+    """Run the standard graph's nodes, on their real models, against the fake server into a fresh ledger."""
+    fake_openai()
+    ledger = TokenLedger()
+    entries = []
+    record = ledger.record
+    monkeypatch.setattr(ledger, "record", lambda node, model, messages, **kwargs: entries.append(
+        {**record(node, model, messages, **kwargs), "messages": messages}))
+    monkeypatch.setattr(nodes, "ledger", ledger)
+
+    def run(article):
+        entries.clear()
+        state = {"article": article}
+        state.update(nodes.quote_generator(state))
+        state.update(nodes.summarizer(state))
+        nodes.insta_caption_generator(state)
+        return {entry["node"]: entry for entry in entries}
+
+    return run
+
+
+def test_distinct_articles_share_no_cacheable_prefix(replay):
+    """Across articles nothing is reusable: the shared preamble is far below the cache minimum."""
+    for article in (ARTICLE, OTHER_ARTICLE):
+        calls = replay(article)
+        assert set(calls) == {"quote_generator", "summarizer", "insta_caption_generator"}
+        assert calls["summarizer"]["model"] == "gpt-4o-mini"
+        assert all(entry["cacheable_tokens"] == 0 for entry in calls.values())
+        # The caption call's constant task and examples precede the per-article summary and quotes
+        assert calls["insta_caption_generator"]["messages"][:2] == [sundial_sys_msg, insta_caption_sys_msg]
+
+
+def test_rerunning_an_article_reuses_its_prefix(replay):
+    """Generating the same article again within the TTL repeats each article call's prefix."""
+    replay(ARTICLE)
+    again = replay(ARTICLE)
+    for node in ("quote_generator", "summarizer"):
+        entry = again[node]
+        assert entry["cacheable_tokens"] > 0
+        assert entry["cacheable_tokens"] % CACHE_INCREMENT == 0
+        assert entry["cacheable_tokens"] + entry["uncached_tokens"] == entry["input_tokens"]
+
+
+def test_article_totals_are_popped_once():
+    ledger = TokenLedger()
+    first = ledger.record("quote_generator", "gpt-4o",
+                          [sundial_sys_msg, HumanMessage(content=ARTICLE), pullout_sys_msg], article=ARTICLE)
+    second = ledger.record("summarizer", "gpt-4o-mini",
+                           [sundial_sys_msg, HumanMessage(content=ARTICLE), summarizer_sys_msg], article=ARTICLE)
+    totals = ledger.pop_article_totals(ARTICLE)
+    assert totals["calls"] == 2
+    assert totals["input_tokens"] == first["input_tokens"] + second["input_tokens"]
+    assert ledger.pop_article_totals(ARTICLE) == {}
+
+
+def test_prefix_is_per_model_and_short_prompts_never_cache():
+    """Caches are not shared between models, and prompts under the minimum are never cached."""
+    ledger = TokenLedger()
+    messages = [sundial_sys_msg, HumanMessage(content=ARTICLE), pullout_sys_msg]
+    ledger.record("a", "gpt-4o", messages)
+    assert ledger.record("b", "gpt-4o-mini", messages)["cacheable_tokens"] == 0
+
+    short = [SystemMessage(content="hi"), HumanMessage(content="short article")]
+    ledger.record("c", "gpt-4o", short)
+    assert ledger.record("d", "gpt-4o", short)["cacheable_tokens"] == 0
+
+
+def test_expired_prefixes_are_forgotten():
+    """Prefixes older than the cache TTL no longer count."""
+    ledger = TokenLedger(ttl_seconds=10)
+    messages = [sundial_sys_msg, HumanMessage(content=ARTICLE), pullout_sys_msg]
+    ledger.record("a", "gpt-4o", messages, now=0)
+    assert ledger.record("b", "gpt-4o", messages, now=100)["cacheable_tokens"] == 0
+
+
+def test_provider_usage_is_recorded():
+    """Provider-reported usage is passed through next to the local estimate."""
+    ledger = TokenLedger()
+    usage = {"input_tokens": 1500, "output_tokens": 90, "input_token_details": {"cache_read": 1024}}
+    entry = ledger.record("a", "gpt-4o", [HumanMessage(content="x")], usage=usage)
+    assert entry["provider_cached_tokens"] == 1024
+    assert entry["output_tokens"] == 90